@@ -1,6 +1,34 @@
 import asyncio
+import os
 
 from src.flappy import Flappy
+from src.utils.decision_grid import DEFAULT_RESOLUTION
+from src.utils.fuzzy_params import load_params
+
+
+def lookup_resolution():
+    """reads LOOKUP=1 or LOOKUP=33,31,51,129 from the environment"""
+    value = os.environ.get("LOOKUP")
+    if not value:
+        return None
+    if value.lower() in ("1", "true"):
+        return DEFAULT_RESOLUTION
+    return tuple(int(n) for n in value.split(","))
+
+
+def fuzzy_params():
+    """reads FUZZY_PARAMS=best_params.json written by src.optimize"""
+    path = os.environ.get("FUZZY_PARAMS")
+    return load_params(path) if path else None
+
 
 if __name__ == "__main__":
-    asyncio.run(Flappy().start())
+    flappy = Flappy(
+        lookup_resolution=lookup_resolution(),
+        telemetry_path=os.environ.get("TELEMETRY"),
+        fuzzy_params=fuzzy_params(),
+        profile_path=os.environ.get("PROFILE"),
+        show_profile=bool(os.environ.get("PROFILE_HUD")),
+        speed=int(os.environ.get("SPEED", 1)),
+    )
+    asyncio.run(flappy.start())
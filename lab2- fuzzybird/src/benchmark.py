@@ -0,0 +1,184 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from typing import Callable, Dict
+
+import pygame
+
+from .entities import Floor, Pipes, Player, PlayerMode
+from .headless import HeadlessFlappy
+from .utils import DEFAULT_RESOLUTION, GameConfig, get_hit_mask, pixel_collision
+
+BASELINE = "benchmark_baseline.json"
+SEEDS = range(5)
+LOOKUP_RESOLUTION = DEFAULT_RESOLUTION
+
+
+def measure(func: Callable[[], object], number: int, repeat: int = 5) -> float:
+    """returns the best time of ``repeat`` runs in µs per call"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / number * 1e6
+
+
+def controller_inputs(count: int, seed: int = 0):
+    """returns reproducible controller inputs spread over the universes"""
+    rng = random.Random(seed)
+    return [
+        (
+            rng.uniform(0, 512),
+            rng.uniform(-15, 15),
+            rng.uniform(0, 500),
+            rng.uniform(-300, 300),
+        )
+        for _ in range(count)
+    ]
+
+
+def bench_controller(game: HeadlessFlappy, number: int) -> float:
+    inputs = iter(controller_inputs(number * 5))
+    return measure(lambda: game.fuzzy_logic_controller(*next(inputs)), number)
+
+
+def run(quick: bool = False) -> Dict[str, float]:
+    """runs every benchmark and returns µs per operation by name"""
+    scale = 10 if quick else 1
+    results = {}
+
+    game = HeadlessFlappy(batch_engine=False)
+    results["controller_skfuzzy"] = bench_controller(game, 200 // scale)
+    game = HeadlessFlappy()
+    results["controller_engine"] = bench_controller(game, 2_000 // scale)
+    game = HeadlessFlappy(lookup_resolution=LOOKUP_RESOLUTION, build_grid=True)
+    results["controller_lookup"] = bench_controller(game, 20_000 // scale)
+
+    # entities drawing to an off-screen surface instead of a window
+    window = game.config.window
+    config = GameConfig(
+        screen=pygame.Surface((window.width, window.height)),
+        clock=None,
+        fps=0,
+        window=window,
+        images=game.config.images,
+        sounds=game.config.sounds,
+    )
+    image = config.images.pipe[0]
+    results["get_hit_mask_cached"] = measure(
+        lambda: get_hit_mask(image), 100_000 // scale
+    )
+    results["get_hit_mask_cold"] = measure(
+        lambda: get_hit_mask.__wrapped__(image), 2_000 // scale
+    )
+
+    player = Player(config)
+    player.set_mode(PlayerMode.NORMAL)
+    pipes = Pipes(config, rng=random.Random(0))
+    pipe = pipes.lower[0]
+    # a placement where the rects overlap, so the masks are compared
+    pipe.x, pipe.y = player.x + player.w / 2, player.y + player.h / 2
+    results["pixel_collision"] = measure(
+        lambda: pixel_collision(
+            player.rect, pipe.rect, player.hit_mask, pipe.hit_mask
+        ),
+        100_000 // scale,
+    )
+
+    def draw_player():
+        player.rot = (player.rot - 3) % 110 - 90
+        player.draw_player()
+
+    results["player_draw"] = measure(draw_player, 20_000 // scale)
+
+    pipes = Pipes(config, rng=random.Random(0))
+    results["pipes_tick"] = measure(pipes.tick, 20_000 // scale)
+
+    floor = Floor(config)
+    results["floor_tick"] = measure(floor.tick, 20_000 // scale)
+
+    # end to end: µs per headless frame over seeded episodes
+    game = HeadlessFlappy(lookup_resolution=LOOKUP_RESOLUTION, build_grid=True)
+    max_frames = 2_000 // scale
+    start = time.perf_counter()
+    frames = sum(result.frames for result in game.run(SEEDS, max_frames))
+    results["headless_frame"] = (time.perf_counter() - start) / frames * 1e6
+    return results
+
+
+def compare(results, baseline, threshold: float):
+    """returns (name, baseline, current, ratio) for every benchmark slower
+    than its baseline by more than threshold"""
+    regressions = []
+    for name, value in results.items():
+        if name in baseline and value > baseline[name] * (1 + threshold):
+            ratio = value / baseline[name]
+            regressions.append((name, baseline[name], value, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuzzy Bird benchmarks")
+    parser.add_argument("--output", default=None, help="write results as JSON")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="store these results as the new baseline",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="allowed slowdown against the baseline, 0.25 = 25%%",
+    )
+    parser.add_argument("--quick", action="store_true", help="fewer iterations")
+    args = parser.parse_args()
+
+    results = run(args.quick)
+    report = {
+        "unit": "us",
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "machine": platform.platform(),
+        "quick": args.quick,
+        "results": results,
+    }
+    for name, value in results.items():
+        print(f"{name:>22}: {value:10.2f} µs")
+    print(f"{'headless fps':>22}: {1e6 / results['headless_frame']:10.0f}")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"baseline saved to {args.baseline}")
+        return
+
+    try:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+    except FileNotFoundError:
+        print(f"no baseline at {args.baseline}, run with --save-baseline")
+        return
+    if baseline.get("quick", False) != args.quick:
+        sys.exit("baseline and results differ in --quick, not comparable")
+
+    regressions = compare(results, baseline["results"], args.threshold)
+    for name, before, after, ratio in regressions:
+        print(
+            f"regression in {name}: {before:.2f} -> {after:.2f} µs "
+            f"({ratio:.2f}x)"
+        )
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import argparse
+import time
+
+from .flappy import FUZZY_INPUTS
+from .headless import HeadlessFlappy
+from .utils import DEFAULT_RESOLUTION, DecisionGrid, load_params
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build the decision grid offline and check its accuracy"
+    )
+    parser.add_argument(
+        "--resolution",
+        type=lambda value: tuple(int(n) for n in value.split(",")),
+        default=DEFAULT_RESOLUTION,
+        help="grid points per input, e.g. 33,31,51,129",
+    )
+    parser.add_argument(
+        "--params", default=None, help="membership breakpoints from optimize"
+    )
+    parser.add_argument(
+        "--samples",
+        type=int,
+        default=1000,
+        help="random states compared with the exact controller",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    game = HeadlessFlappy(
+        fuzzy_params=load_params(args.params) if args.params else None
+    )
+    start = time.perf_counter()
+    grid = DecisionGrid(
+        game.flappy_ctrl, FUZZY_INPUTS, args.resolution, build=True
+    )
+    print(f"{grid.path} ready in {time.perf_counter() - start:.1f}s")
+
+    report = grid.max_disagreement(
+        game.flappy_simulation, samples=args.samples, seed=args.seed
+    )
+    print(
+        f"{report['mismatches']} of {report['samples']} sampled decisions "
+        f"differ ({report['mismatch_rate']:.2%}), "
+        f"max margin {report['max_margin']:.3f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@ from .entity import Entity
 
 
 class Background(Entity):
+    __slots__ = ()
+
     def __init__(self, config: GameConfig) -> None:
         super().__init__(
             config,
@@ -12,3 +14,10 @@ class Background(Entity):
             config.window.width,
             config.window.height,
         )
+        if config.renderer:
+            # a new round may come with a different background
+            config.renderer.invalidate()
+
+    def draw(self) -> None:
+        if not self.config.headless:
+            self.config.renderer.restore(self.image)
@@ -2,10 +2,42 @@ from typing import Optional
 
 import pygame
 
-from ..utils import GameConfig, get_hit_mask, pixel_collision
+from ..utils import (
+    GameConfig,
+    get_debug_font,
+    get_hit_mask,
+    pixel_collision,
+    scale_image,
+)
 
 
 class Entity:
+    """Base of all game objects.
+
+    State lives in ``__slots__`` instead of a per-instance ``__dict__``.
+    ``rect``, ``cx`` and ``cy`` are computed on first use and cached until
+    ``x``, ``y``, ``w`` or ``h`` change, so the collision and crossing
+    checks that read them several times per frame don't rebuild them.
+    The cached rect is shared; copy it before modifying it.
+
+    ``update`` advances the simulation by one step and ``render`` draws the
+    current state, so the game can simulate several steps per rendered
+    frame; ``tick`` does one of each.
+    """
+
+    __slots__ = (
+        "config",
+        "image",
+        "hit_mask",
+        "_x",
+        "_y",
+        "_w",
+        "_h",
+        "_rect",
+        "_cx",
+        "_cy",
+    )
+
     def __init__(
         self,
         config: GameConfig,
@@ -14,22 +46,21 @@ class Entity:
         y=0,
         w: int = None,
         h: int = None,
-        **kwargs,
     ) -> None:
         self.config = config
-        self.x = x
-        self.y = y
+        self._rect = self._cx = self._cy = None
+        self._x = x
+        self._y = y
         if w or h:
-            self.w = w or config.window.ratio * h
-            self.h = h or w / config.window.ratio
-            self.image = pygame.transform.scale(image, (self.w, self.h))
+            self._w = w or config.window.ratio * h
+            self._h = h or w / config.window.ratio
+            self.image = scale_image(image, (self.w, self.h))
         else:
             self.image = image
-            self.w = image.get_width() if image else 0
-            self.h = image.get_height() if image else 0
+            self._w = image.get_width() if image else 0
+            self._h = image.get_height() if image else 0
 
         self.hit_mask = get_hit_mask(image) if image else None
-        self.__dict__.update(kwargs)
 
     def update_image(
         self, image: pygame.Surface, w: int = None, h: int = None
@@ -39,38 +70,91 @@ class Entity:
         self.w = w or (image.get_width() if image else 0)
         self.h = h or (image.get_height() if image else 0)
 
+    @property
+    def x(self):
+        return self._x
+
+    @x.setter
+    def x(self, value) -> None:
+        self._x = value
+        self._rect = self._cx = None
+
+    @property
+    def y(self):
+        return self._y
+
+    @y.setter
+    def y(self, value) -> None:
+        self._y = value
+        self._rect = self._cy = None
+
+    @property
+    def w(self):
+        return self._w
+
+    @w.setter
+    def w(self, value) -> None:
+        if value != self._w:
+            self._w = value
+            self._rect = self._cx = None
+
+    @property
+    def h(self):
+        return self._h
+
+    @h.setter
+    def h(self, value) -> None:
+        if value != self._h:
+            self._h = value
+            self._rect = self._cy = None
+
     @property
     def cx(self) -> float:
-        return self.x + self.w / 2
+        if self._cx is None:
+            self._cx = self._x + self._w / 2
+        return self._cx
 
     @property
     def cy(self) -> float:
-        return self.y + self.h / 2
+        if self._cy is None:
+            self._cy = self._y + self._h / 2
+        return self._cy
 
     @property
     def rect(self) -> pygame.Rect:
-        return pygame.Rect(self.x, self.y, self.w, self.h)
+        if self._rect is None:
+            self._rect = pygame.Rect(self._x, self._y, self._w, self._h)
+        return self._rect
 
     def collide(self, other) -> bool:
-        if not self.hit_mask or not other.hit_mask:
+        if self.hit_mask is None or other.hit_mask is None:
             return self.rect.colliderect(other.rect)
         return pixel_collision(
             self.rect, other.rect, self.hit_mask, other.hit_mask
         )
 
     def tick(self) -> None:
+        self.update()
+        self.render()
+
+    def update(self) -> None:
+        """advances the entity by one simulation step"""
+
+    def render(self) -> None:
+        """draws the entity and, in debug mode, its rect and coordinates"""
         self.draw()
-        rect = self.rect
-        if self.config.debug:
-            pygame.draw.rect(self.config.screen, (255, 0, 0), rect, 1)
+        if self.config.debug and not self.config.headless:
+            rect = self.rect
+            self.config.renderer.mark(
+                pygame.draw.rect(self.config.screen, (255, 0, 0), rect, 1)
+            )
             # write x and y at top of rect
-            font = pygame.font.SysFont("Arial", 13, True)
-            text = font.render(
+            text = get_debug_font().render(
                 f"{self.x:.1f}, {self.y:.1f}, {self.w:.1f}, {self.h:.1f}",
                 True,
                 (255, 255, 255),
             )
-            self.config.screen.blit(
+            self.config.renderer.blit(
                 text,
                 (
                     rect.x + rect.w / 2 - text.get_width() / 2,
@@ -79,5 +163,5 @@ class Entity:
             )
 
     def draw(self) -> None:
-        if self.image:
-            self.config.screen.blit(self.image, self.rect)
+        if self.image and not self.config.headless:
+            self.config.renderer.blit(self.image, self.rect)
@@ -3,6 +3,8 @@ from .entity import Entity
 
 
 class Floor(Entity):
+    __slots__ = ("vel_x", "x_extra")
+
     def __init__(self, config: GameConfig) -> None:
         super().__init__(config, config.images.base, 0, config.window.vh)
         self.vel_x = 4
@@ -11,6 +13,5 @@ class Floor(Entity):
     def stop(self) -> None:
         self.vel_x = 0
 
-    def draw(self) -> None:
+    def update(self) -> None:
         self.x = -((-self.x + self.vel_x) % self.x_extra)
-        super().draw()
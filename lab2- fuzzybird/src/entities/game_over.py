@@ -3,6 +3,8 @@ from .entity import Entity
 
 
 class GameOver(Entity):
+    __slots__ = ()
+
     def __init__(self, config: GameConfig) -> None:
         super().__init__(
             config=config,
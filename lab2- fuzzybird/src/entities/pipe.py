@@ -6,99 +6,139 @@ from .entity import Entity
 
 
 class Pipe(Entity):
+    __slots__ = ("vel_x",)
+
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
         self.vel_x = -5
 
-    def draw(self) -> None:
-        self.x += self.vel_x
-        super().draw()
-
 
 class Pipes(Entity):
+    """Pairs of upper and lower pipes scrolling towards the player.
+
+    Pipe objects live in a fixed-capacity ring buffer allocated up front;
+    a pair that scrolls off screen is recycled for the next spawn instead
+    of building new entities. ``upper`` and ``lower`` list the active pairs
+    from oldest to newest and are only rebuilt when a pair spawns or leaves.
+    """
+
+    __slots__ = (
+        "rng",
+        "pipe_gap",
+        "top",
+        "bottom",
+        "pool_upper",
+        "pool_lower",
+        "head",
+        "count",
+        "upper",
+        "lower",
+    )
+
     upper: List[Pipe]
     lower: List[Pipe]
 
-    def __init__(self, config: GameConfig) -> None:
+    def __init__(
+        self, config: GameConfig, rng: random.Random = None, capacity: int = 4
+    ) -> None:
         super().__init__(config)
+        # seeded generator makes the pipe sequence reproducible
+        self.rng = rng or random
         self.pipe_gap = 120
         self.top = 0
         self.bottom = self.config.window.viewport_height
+        self.pool_upper = [
+            Pipe(config, config.images.pipe[0]) for _ in range(capacity)
+        ]
+        self.pool_lower = [
+            Pipe(config, config.images.pipe[1]) for _ in range(capacity)
+        ]
+        # active pairs are pool[head], ..., pool[head + count - 1] (mod size)
+        self.head = 0
+        self.count = 0
         self.upper = []
         self.lower = []
         self.spawn_initial_pipes()
 
-    def tick(self) -> None:
+    def update(self) -> None:
         if self.can_spawn_pipes():
             self.spawn_new_pipes()
         self.remove_old_pipes()
 
         for up_pipe, low_pipe in zip(self.upper, self.lower):
-            up_pipe.tick()
-            low_pipe.tick()
+            up_pipe.x += up_pipe.vel_x
+            low_pipe.x += low_pipe.vel_x
+
+    def render(self) -> None:
+        for up_pipe, low_pipe in zip(self.upper, self.lower):
+            up_pipe.render()
+            low_pipe.render()
 
     def stop(self) -> None:
-        for pipe in self.upper + self.lower:
-            pipe.vel_x = 0
+        for up_pipe, low_pipe in zip(self.pool_upper, self.pool_lower):
+            up_pipe.vel_x = 0
+            low_pipe.vel_x = 0
 
     def can_spawn_pipes(self) -> bool:
-        last = self.upper[-1]
-        if not last:
+        if not self.count:
             return True
-
+        last = self.upper[-1]
         return self.config.window.width - (last.x + last.w) > last.w * 2.5
 
     def spawn_new_pipes(self):
         # add new pipe when first pipe is about to touch left of screen
-        upper, lower = self.make_random_pipes()
-        self.upper.append(upper)
-        self.lower.append(lower)
+        self.make_random_pipes()
 
     def remove_old_pipes(self):
-        # remove first pipe if its out of the screen
-        for pipe in self.upper:
-            if pipe.x < -pipe.w:
-                self.upper.remove(pipe)
-
-        for pipe in self.lower:
-            if pipe.x < -pipe.w:
-                self.lower.remove(pipe)
+        # recycle the oldest pairs once they are out of the screen
+        while self.count and self.upper[0].x < -self.upper[0].w:
+            self.head = (self.head + 1) % len(self.pool_upper)
+            self.count -= 1
+            self.upper.pop(0)
+            self.lower.pop(0)
 
     def spawn_initial_pipes(self):
         upper_1, lower_1 = self.make_random_pipes()
         upper_1.x = self.config.window.width + upper_1.w * 3
         lower_1.x = self.config.window.width + upper_1.w * 3
-        self.upper.append(upper_1)
-        self.lower.append(lower_1)
 
         upper_2, lower_2 = self.make_random_pipes()
         upper_2.x = upper_1.x + upper_1.w * 3.5
         lower_2.x = upper_1.x + upper_1.w * 3.5
-        self.upper.append(upper_2)
-        self.lower.append(lower_2)
+
+    def next_free(self):
+        """returns the pool slot after the newest active pair"""
+        size = len(self.pool_upper)
+        if self.count == size:
+            # more pairs on screen than expected: grow the ring once
+            self.pool_upper[self.head : self.head] = [
+                Pipe(self.config, self.config.images.pipe[0])
+            ]
+            self.pool_lower[self.head : self.head] = [
+                Pipe(self.config, self.config.images.pipe[1])
+            ]
+            self.head += 1
+            size += 1
+        return (self.head + self.count) % size
 
     def make_random_pipes(self):
-        """returns a randomly generated pipe"""
+        """activates the next pooled pair at a random gap and returns it"""
         # y of gap between upper and lower pipe
         base_y = self.config.window.viewport_height
 
-        gap_y = random.randrange(0, int(base_y * 0.6 - self.pipe_gap))
+        gap_y = self.rng.randrange(0, int(base_y * 0.6 - self.pipe_gap))
         gap_y += int(base_y * 0.2)
         pipe_height = self.config.images.pipe[0].get_height()
         pipe_x = self.config.window.width + 10
 
-        upper_pipe = Pipe(
-            self.config,
-            self.config.images.pipe[0],
-            pipe_x,
-            gap_y - pipe_height,
-        )
-
-        lower_pipe = Pipe(
-            self.config,
-            self.config.images.pipe[1],
-            pipe_x,
-            gap_y + self.pipe_gap,
-        )
+        slot = self.next_free()
+        upper_pipe = self.pool_upper[slot]
+        lower_pipe = self.pool_lower[slot]
+        upper_pipe.x, upper_pipe.y = pipe_x, gap_y - pipe_height
+        lower_pipe.x, lower_pipe.y = pipe_x, gap_y + self.pipe_gap
+        upper_pipe.vel_x = lower_pipe.vel_x = -5
 
+        self.count += 1
+        self.upper.append(upper_pipe)
+        self.lower.append(lower_pipe)
         return upper_pipe, lower_pipe
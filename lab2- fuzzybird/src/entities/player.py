@@ -1,8 +1,6 @@
 from enum import Enum
 from itertools import cycle
 
-import pygame
-
 from ..utils import GameConfig, clamp
 from .entity import Entity
 from .floor import Floor
@@ -16,6 +14,27 @@ class PlayerMode(Enum):
 
 
 class Player(Entity):
+    __slots__ = (
+        "min_y",
+        "max_y",
+        "img_idx",
+        "img_gen",
+        "frame",
+        "crashed",
+        "crash_entity",
+        "mode",
+        "vel_y",
+        "max_vel_y",
+        "min_vel_y",
+        "acc_y",
+        "rot",
+        "vel_rot",
+        "rot_min",
+        "rot_max",
+        "flap_acc",
+        "flapped",
+    )
+
     def __init__(self, config: GameConfig) -> None:
         image = config.images.player[0]
         x = int(config.window.width * 0.2)
@@ -115,7 +134,7 @@ class Player(Entity):
     def rotate(self) -> None:
         self.rot = clamp(self.rot + self.vel_rot, self.rot_min, self.rot_max)
 
-    def draw(self) -> None:
+    def update(self) -> None:
         self.update_image()
         if self.mode == PlayerMode.SHM:
             self.tick_shm()
@@ -124,12 +143,17 @@ class Player(Entity):
         elif self.mode == PlayerMode.CRASH:
             self.tick_crash()
 
+    def draw(self) -> None:
         self.draw_player()
 
     def draw_player(self) -> None:
-        rotated_image = pygame.transform.rotate(self.image, self.rot)
+        if self.config.headless:
+            return
+        rotated_image = self.config.images.player_rotations.get(
+            self.img_idx, self.rot
+        )
         rotated_rect = rotated_image.get_rect(center=self.rect.center)
-        self.config.screen.blit(rotated_image, rotated_rect)
+        self.config.renderer.blit(rotated_image, rotated_rect)
 
     def stop_wings(self) -> None:
         self.img_gen = cycle([self.img_idx])
@@ -153,13 +177,15 @@ class Player(Entity):
             self.crash_entity = "floor"
             return True
 
-        for pipe in pipes.upper:
-            if self.collide(pipe):
-                self.crashed = True
-                self.crash_entity = "pipe"
-                return True
-        for pipe in pipes.lower:
-            if self.collide(pipe):
+        # broad phase: pipes are ordered by x, so only the pair overlapping
+        # the player's columns (at most one in practice) needs a mask test
+        left, right = self.x, self.x + self.w
+        for up_pipe, low_pipe in zip(pipes.upper, pipes.lower):
+            if up_pipe.x + up_pipe.w < left:
+                continue
+            if up_pipe.x > right:
+                break
+            if self.collide(up_pipe) or self.collide(low_pipe):
                 self.crashed = True
                 self.crash_entity = "pipe"
                 return True
@@ -5,10 +5,14 @@ from .entity import Entity
 
 
 class Score(Entity):
+    __slots__ = ("score", "surface", "surface_score")
+
     def __init__(self, config: GameConfig) -> None:
         super().__init__(config)
         self.y = self.config.window.height * 0.1
         self.score = 0
+        self.surface = None
+        self.surface_score = None
 
     def reset(self) -> None:
         self.score = 0
@@ -17,22 +21,31 @@ class Score(Entity):
         self.score += 1
         self.config.sounds.point.play()
 
+    def get_surface(self) -> pygame.Surface:
+        """returns the score digits composed into one surface, rebuilt only
+        when the score changes"""
+        if self.surface_score != self.score:
+            images = [
+                self.config.images.numbers[int(x)] for x in str(self.score)
+            ]
+            w = sum(image.get_width() for image in images)
+            h = max(image.get_height() for image in images)
+            self.surface = pygame.Surface((w, h), pygame.SRCALPHA)
+            x_offset = 0
+            for image in images:
+                self.surface.blit(image, (x_offset, 0))
+                x_offset += image.get_width()
+            self.surface_score = self.score
+        return self.surface
+
     @property
     def rect(self) -> pygame.Rect:
-        score_digits = [int(x) for x in list(str(self.score))]
-        images = [self.config.images.numbers[digit] for digit in score_digits]
-        w = sum(image.get_width() for image in images)
-        x = (self.config.window.width - w) / 2
-        h = max(image.get_height() for image in images)
-        return pygame.Rect(x, self.y, w, h)
+        surface = self.get_surface()
+        x = (self.config.window.width - surface.get_width()) / 2
+        return pygame.Rect(x, self.y, surface.get_width(), surface.get_height())
 
     def draw(self) -> None:
         """displays score in center of screen"""
-        score_digits = [int(x) for x in list(str(self.score))]
-        images = [self.config.images.numbers[digit] for digit in score_digits]
-        digits_width = sum(image.get_width() for image in images)
-        x_offset = (self.config.window.width - digits_width) / 2
-
-        for image in images:
-            self.config.screen.blit(image, (x_offset, self.y))
-            x_offset += image.get_width()
+        if self.config.headless:
+            return
+        self.config.renderer.blit(self.get_surface(), self.rect)
@@ -3,6 +3,8 @@ from .entity import Entity
 
 
 class WelcomeMessage(Entity):
+    __slots__ = ()
+
     def __init__(self, config: GameConfig) -> None:
         image = config.images.welcome_message
         super().__init__(
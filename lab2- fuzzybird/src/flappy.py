@@ -1,5 +1,6 @@
 import asyncio
 import sys
+import time
 
 import numpy as np
 import pygame
@@ -17,11 +18,37 @@ from .entities import (
     Score,
     WelcomeMessage,
 )
-from .utils import GameConfig, Images, Sounds, Window
+from .utils import (
+    DEFAULT_PARAMS,
+    BatchFuzzyEngine,
+    ControllerScheduler,
+    DecisionGrid,
+    FlightRecorder,
+    FrameProfiler,
+    GameConfig,
+    Images,
+    Sounds,
+    Window,
+)
+
+FUZZY_INPUTS = ("bird_y", "bird_vel_y", "distance_to_pipe", "height_difference")
+# fast-forward factors cycled with the F key, 0 is unlimited
+SPEEDS = (1, 2, 10, 0)
 
 
 class Flappy:
-    def __init__(self):
+    def __init__(
+        self,
+        lookup_resolution=None,
+        decide_every=1,
+        decision_budget_ms=None,
+        telemetry_path=None,
+        fuzzy_params=None,
+        profile_path=None,
+        show_profile=False,
+        speed=1,
+        render_every=None,
+    ):
         pygame.init()
         pygame.display.set_caption("Fuzzy Bird")
         window = Window(288, 512)
@@ -37,10 +64,69 @@ class Flappy:
             sounds=Sounds(),
         )
 
+        self.profiler = FrameProfiler(path=profile_path)
+        self.show_profile = show_profile
+        # simulation steps per 1/fps of wall time and per rendered frame
+        self.speed = speed
+        self.render_every = render_every
+        self.setup_controller(
+            lookup_resolution,
+            decide_every,
+            decision_budget_ms,
+            telemetry_path,
+            fuzzy_params,
+        )
+
+    def setup_controller(
+        self,
+        lookup_resolution=None,
+        decide_every=1,
+        decision_budget_ms=None,
+        telemetry_path=None,
+        fuzzy_params=None,
+        batch_engine=False,
+        build_grid=False,
+    ):
+        """Set up the fuzzy controller, its decision grid and the flight recorder.
+
+        Shared by the game and the headless runner, so both decide the same way.
+
+        Args:
+            lookup_resolution (tuple): Grid size per input, or None to run the controller.
+            decide_every (int): Frames per controller decision.
+            decision_budget_ms (float): Skip frames after decisions slower than this.
+            telemetry_path (str): File to record decisions to, or None.
+            fuzzy_params (dict): Membership breakpoints, DEFAULT_PARAMS if None.
+            batch_engine (bool): Decide with the vectorized engine instead of skfuzzy's `compute()`.
+            build_grid (bool): Build a missing decision grid instead of failing.
+        """
+        self.decide_every = decide_every
+        self.decision_budget_ms = decision_budget_ms
+        self.round = 0
+
+        self.batch_engine = batch_engine
+        self.fuzzy_params = fuzzy_params or DEFAULT_PARAMS
+        self.recorder = None
+        if telemetry_path:
+            # what a replay needs to rebuild the same controller
+            lookup = list(lookup_resolution) if lookup_resolution else None
+            self.recorder = FlightRecorder(
+                telemetry_path,
+                metadata={"params": self.fuzzy_params, "lookup": lookup},
+            )
         self.initialize_fuzzy_controller()
+        self.decision_grid = None
+        if lookup_resolution:
+            self.decision_grid = DecisionGrid(
+                self.flappy_ctrl,
+                FUZZY_INPUTS,
+                lookup_resolution,
+                build=build_grid,
+            )
 
     async def start(self):
         while True:
+            self.round += 1
             self.background = Background(self.config)
             self.floor = Floor(self.config)
             self.player = Player(self.config)
@@ -68,7 +154,7 @@ class Flappy:
             self.player.tick()
             self.welcome_message.tick()
 
-            pygame.display.update()
+            self.config.renderer.update()
             await asyncio.sleep(0)
             self.config.tick()
 
@@ -91,49 +177,148 @@ class Flappy:
         self.score.reset()
         self.player.set_mode(PlayerMode.NORMAL)
 
-        asyncio.create_task(self.flap_every_frame())
-
-        while True:
-            if self.player.collided(self.pipes, self.floor):
-                return
-
-            for i, pipe in enumerate(self.pipes.upper):
-                if self.player.crossed(pipe):
-                    self.score.add()
+        self.scheduler = self.make_scheduler()
+        self.scheduler.start()
+        profiler = self.profiler
+        profiler.begin()
+        try:
+            while True:
+                for event in pygame.event.get():
+                    self.check_quit_event(event)
+                    if event.type == KEYDOWN and event.key == pygame.K_f:
+                        self.cycle_speed()
+                profiler.mark("events")
+
+                if self.speed:
+                    for _ in range(self.render_every or self.speed):
+                        if not await self.step():
+                            return
+                else:
+                    # unlimited: simulate until this frame's time is used up
+                    deadline = time.perf_counter() + 1 / self.config.fps
+                    while time.perf_counter() < deadline:
+                        if not await self.step():
+                            return
+
+                self.render()
+                self.config.renderer.update()
+                profiler.mark("display")
+                self.config.tick(self.frame_rate())
+                profiler.mark("wait")
+                profiler.end_frame()
+        finally:
+            await self.scheduler.stop()
+
+    async def step(self):
+        """Advance the game by one fixed simulation step.
+
+        Every step is the same regardless of speed and rendering, so a run is
+        identical at any fast-forward factor.
 
-            for event in pygame.event.get():
-                self.check_quit_event(event)
+        Returns:
+            bool: False if the bird crashed, True otherwise.
+        """
+        if not self.advance():
+            return False
 
-            self.background.tick()
-            self.floor.tick()
-            self.pipes.tick()
-            self.score.tick()
-            self.player.tick()
+        self.scheduler.frame()
+        # the scheduler task takes the decision here
+        await asyncio.sleep(0)
+        self.profiler.mark("controller")
+        return True
 
-            pygame.display.update()
-            await asyncio.sleep(0)
-            self.config.tick()
+    def advance(self):
+        """Simulate one step of the world: collisions, score, pending flaps and movement.
 
-    async def flap_every_frame(self):
-        """Continuously evaluate and decide whether the bird should flap in each frame using the fuzzy logic controller.
+        The controller decision for the next step is left to the caller, which
+        lets the game run it in the scheduler task and the headless runner
+        call it directly, while both share the rest of the frame.
 
-        This method runs asynchronously during gameplay, retrieving current state parameters,
-        computing the action using the fuzzy logic controller, and making the bird flap if necessary.
+        Returns:
+            bool: False if the bird crashed, True otherwise.
         """
-        while not self.player.crashed:
-            bird_y = self.player.y
-            bird_vel_y = self.player.vel_y
-            distance_to_pipe, pipe_gap_y = self.get_next_pipe_data()
-            height_difference = pipe_gap_y - bird_y
+        profiler = self.profiler
+        if self.player.collided(self.pipes, self.floor):
+            return False
+
+        for pipe in self.pipes.upper:
+            if self.player.crossed(pipe):
+                self.score.add()
+        profiler.mark("collision")
 
-            should_flap = self.fuzzy_logic_controller(bird_y, bird_vel_y, distance_to_pipe, height_difference)
+        for should_flap in self.scheduler.actions():
             if should_flap:
                 self.player.flap()
+        profiler.mark("controller")
+
+        self.floor.update()
+        self.pipes.update()
+        profiler.mark("pipes")
+        self.player.update()
+        profiler.mark("player")
+        return True
+
+    def render(self):
+        """Draw the current state of the game."""
+        self.background.render()
+        self.floor.render()
+        self.pipes.render()
+        self.score.render()
+        self.player.render()
+        if self.show_profile:
+            self.profiler.draw_hud(self.config.renderer)
+        self.profiler.mark("blit")
+
+    def frame_rate(self):
+        """Get the rendered frames per second for the current speed, 0 meaning uncapped."""
+        if not self.speed:
+            return 0
+        return self.config.fps * self.speed / (self.render_every or self.speed)
+
+    def cycle_speed(self):
+        """Switch to the next fast-forward factor (1x, 2x, 10x, unlimited)."""
+        index = SPEEDS.index(self.speed) if self.speed in SPEEDS else -1
+        self.speed = SPEEDS[(index + 1) % len(SPEEDS)]
+
+    def make_scheduler(self):
+        """Create the scheduler that runs the fuzzy controller in step with the game frames."""
+        return ControllerScheduler(
+            self.decide,
+            every=self.decide_every,
+            budget_ms=self.decision_budget_ms,
+        )
+
+    def controller_inputs(self):
+        """Get the current fuzzy controller inputs.
+
+        Returns:
+            tuple: bird_y, bird_vel_y, distance_to_pipe and height_difference.
+        """
+        bird_y = self.player.y
+        distance_to_pipe, pipe_gap_y = self.get_next_pipe_data()
+        return bird_y, self.player.vel_y, distance_to_pipe, pipe_gap_y - bird_y
+
+    def decide(self):
+        """Evaluate the fuzzy logic controller once for the current frame.
 
-            print(
-                f"bird_y: {bird_y}, bird_vel_y: {bird_vel_y}, distance_to_pipe: {distance_to_pipe}, height_difference: {height_difference}, should_flap: {should_flap}"
+        Returns:
+            bool: True if the bird should flap, False otherwise.
+        """
+        inputs = self.controller_inputs()
+        should_flap = self.fuzzy_logic_controller(*inputs)
+
+        if self.recorder is not None:
+            bird_y, _, distance_to_pipe, height_difference = inputs
+            self.recorder.record(
+                self.round,
+                self.scheduler.frame_count,
+                inputs,
+                should_flap,
+                self.player.rot,
+                self.player.x + distance_to_pipe,
+                bird_y + height_difference,
             )
-            await asyncio.sleep(0)
+        return should_flap
 
     def get_next_pipe_data(self):
         """Get the distance to the next pipe and the vertical position of the next pipe's gap.
@@ -170,11 +355,12 @@ class Flappy:
             self.game_over_message.tick()
 
             self.config.tick()
-            pygame.display.update()
+            self.config.renderer.update()
             await asyncio.sleep(0)
 
     def initialize_fuzzy_controller(self):
         """Initialize the fuzzy logic controller with membership functions and rules."""
+        params = self.fuzzy_params
         self.bird_y = ctrl.Antecedent(np.arange(0, 513, 1), 'bird_y')
         self.bird_vel_y = ctrl.Antecedent(np.arange(-15, 16, 1), 'bird_vel_y')
         self.distance_to_pipe = ctrl.Antecedent(np.arange(0, 501, 1), 'distance_to_pipe')
@@ -182,25 +368,25 @@ class Flappy:
 
         self.action = ctrl.Consequent(np.arange(0, 1.01, 0.01), 'action')
 
-        self.bird_y['high'] = fuzz.trimf(self.bird_y.universe, [0, 0, 200])
-        self.bird_y['medium'] = fuzz.trimf(self.bird_y.universe, [150, 256, 362])
-        self.bird_y['low'] = fuzz.trimf(self.bird_y.universe, [300, 512, 512])
+        self.bird_y['high'] = fuzz.trimf(self.bird_y.universe, params['bird_y']['high'])
+        self.bird_y['medium'] = fuzz.trimf(self.bird_y.universe, params['bird_y']['medium'])
+        self.bird_y['low'] = fuzz.trimf(self.bird_y.universe, params['bird_y']['low'])
 
-        self.bird_vel_y['rising_fast'] = fuzz.trimf(self.bird_vel_y.universe, [-15, -15, -5])
-        self.bird_vel_y['rising_slowly'] = fuzz.trimf(self.bird_vel_y.universe, [-10, -5, 0])
-        self.bird_vel_y['stable'] = fuzz.trimf(self.bird_vel_y.universe, [-2, 0, 2])
-        self.bird_vel_y['falling_slowly'] = fuzz.trimf(self.bird_vel_y.universe, [0, 5, 10])
-        self.bird_vel_y['falling_fast'] = fuzz.trimf(self.bird_vel_y.universe, [5, 15, 15])
+        self.bird_vel_y['rising_fast'] = fuzz.trimf(self.bird_vel_y.universe, params['bird_vel_y']['rising_fast'])
+        self.bird_vel_y['rising_slowly'] = fuzz.trimf(self.bird_vel_y.universe, params['bird_vel_y']['rising_slowly'])
+        self.bird_vel_y['stable'] = fuzz.trimf(self.bird_vel_y.universe, params['bird_vel_y']['stable'])
+        self.bird_vel_y['falling_slowly'] = fuzz.trimf(self.bird_vel_y.universe, params['bird_vel_y']['falling_slowly'])
+        self.bird_vel_y['falling_fast'] = fuzz.trimf(self.bird_vel_y.universe, params['bird_vel_y']['falling_fast'])
 
-        self.distance_to_pipe['close'] = fuzz.trimf(self.distance_to_pipe.universe, [0, 0, 150])
-        self.distance_to_pipe['medium'] = fuzz.trimf(self.distance_to_pipe.universe, [100, 250, 400])
-        self.distance_to_pipe['far'] = fuzz.trimf(self.distance_to_pipe.universe, [350, 500, 500])
+        self.distance_to_pipe['close'] = fuzz.trimf(self.distance_to_pipe.universe, params['distance_to_pipe']['close'])
+        self.distance_to_pipe['medium'] = fuzz.trimf(self.distance_to_pipe.universe, params['distance_to_pipe']['medium'])
+        self.distance_to_pipe['far'] = fuzz.trimf(self.distance_to_pipe.universe, params['distance_to_pipe']['far'])
 
-        self.height_difference['much_below'] = fuzz.trimf(self.height_difference.universe, [-512, -512, -100])
-        self.height_difference['below'] = fuzz.trimf(self.height_difference.universe, [-150, -50, 0])
-        self.height_difference['level'] = fuzz.trimf(self.height_difference.universe, [-25, 0, 25])
-        self.height_difference['above'] = fuzz.trimf(self.height_difference.universe, [0, 50, 150])
-        self.height_difference['much_above'] = fuzz.trimf(self.height_difference.universe, [100, 512, 512])
+        self.height_difference['much_below'] = fuzz.trimf(self.height_difference.universe, params['height_difference']['much_below'])
+        self.height_difference['below'] = fuzz.trimf(self.height_difference.universe, params['height_difference']['below'])
+        self.height_difference['level'] = fuzz.trimf(self.height_difference.universe, params['height_difference']['level'])
+        self.height_difference['above'] = fuzz.trimf(self.height_difference.universe, params['height_difference']['above'])
+        self.height_difference['much_above'] = fuzz.trimf(self.height_difference.universe, params['height_difference']['much_above'])
 
         self.action["don't_flap"] = fuzz.trimf(self.action.universe, [0, 0, 0.5])
         self.action['flap'] = fuzz.trimf(self.action.universe, [0.5, 1, 1])
@@ -240,6 +426,7 @@ class Flappy:
 
         self.flappy_ctrl = ctrl.ControlSystem([rule1, rule2, rule3, rule4, rule5, rule6, rule7, rule8])
         self.flappy_simulation = ctrl.ControlSystemSimulation(self.flappy_ctrl)
+        self.fuzzy_engine = BatchFuzzyEngine(self.flappy_ctrl)
 
     def fuzzy_logic_controller(self, bird_y_value, bird_vel_y_value, distance_to_pipe_value, height_difference_value):
         """Compute the action (whether to flap or not) using the fuzzy logic controller.
@@ -252,6 +439,25 @@ class Flappy:
                 Returns:
                     bool: True if the bird should flap, False otherwise.
         """
+        if self.decision_grid is not None:
+            return self.decision_grid.lookup(
+                bird_y_value,
+                bird_vel_y_value,
+                distance_to_pipe_value,
+                height_difference_value,
+            )
+
+        if self.batch_engine:
+            action_value = self.fuzzy_engine.compute(
+                {
+                    "bird_y": bird_y_value,
+                    "bird_vel_y": bird_vel_y_value,
+                    "distance_to_pipe": distance_to_pipe_value,
+                    "height_difference": height_difference_value,
+                }
+            )
+            return bool(action_value > 0.5)
+
         self.flappy_simulation.input['bird_y'] = bird_y_value
         self.flappy_simulation.input['bird_vel_y'] = bird_vel_y_value
         self.flappy_simulation.input['distance_to_pipe'] = distance_to_pipe_value
@@ -267,3 +473,35 @@ class Flappy:
         action_value = self.flappy_simulation.output.get('action', 0)
 
         return action_value > 0.5
+
+    def fuzzy_logic_controller_batch(
+        self,
+        bird_y_values,
+        bird_vel_y_values,
+        distance_to_pipe_values,
+        height_difference_values,
+    ):
+        """Compute flap decisions for many states at once with the vectorized fuzzy engine.
+
+        Uses the same rule base as `fuzzy_logic_controller`; the crisp actions agree with
+        skfuzzy's `compute()` within `fuzzy_engine.TOLERANCE`.
+
+        Args:
+            bird_y_values (array-like): Vertical positions of the bird.
+            bird_vel_y_values (array-like): Vertical velocities of the bird.
+            distance_to_pipe_values (array-like): Horizontal distances to the next pipe.
+            height_difference_values (array-like): Vertical differences between the bird and the pipe gap.
+
+        Returns:
+            np.ndarray: Boolean array, True where the bird should flap.
+        """
+        action_values = self.fuzzy_engine.compute(
+            {
+                "bird_y": bird_y_values,
+                "bird_vel_y": bird_vel_y_values,
+                "distance_to_pipe": distance_to_pipe_values,
+                "height_difference": height_difference_values,
+            }
+        )
+
+        return action_values > 0.5
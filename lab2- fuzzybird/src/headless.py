@@ -0,0 +1,151 @@
+import argparse
+import random
+import time
+from typing import List, NamedTuple
+
+from .entities import Floor, Pipes, Player, PlayerMode, Score
+from .flappy import Flappy
+from .utils import (
+    FrameProfiler,
+    GameConfig,
+    Images,
+    Sounds,
+    Window,
+    load_params,
+)
+
+MAX_FRAMES = 5_000
+
+
+class EpisodeResult(NamedTuple):
+    seed: int
+    score: int
+    frames: int
+
+
+class HeadlessFlappy(Flappy):
+    """Runs Fuzzy Bird without a window, mixer, blitting or frame cap.
+
+    The controller is set up and every frame is simulated by the same
+    ``Flappy`` methods as in the visual game, but nothing is drawn and the
+    loop never waits for the clock, so episodes run as fast as the
+    controller allows. Decisions go through the vectorized fuzzy engine
+    unless ``batch_engine`` is False. Each episode takes a seed for the pipe
+    generator and the sprite choice, which makes results reproducible.
+    """
+
+    def __init__(
+        self,
+        lookup_resolution=None,
+        decide_every=1,
+        decision_budget_ms=None,
+        telemetry_path=None,
+        fuzzy_params=None,
+        batch_engine=True,
+        build_grid=False,
+    ):
+        window = Window(288, 512)
+
+        self.config = GameConfig(
+            screen=None,
+            clock=None,
+            fps=0,
+            window=window,
+            images=Images(headless=True),
+            sounds=Sounds(mute=True),
+        )
+        self.profiler = FrameProfiler()
+        self.setup_controller(
+            lookup_resolution,
+            decide_every,
+            decision_budget_ms,
+            telemetry_path,
+            fuzzy_params,
+            batch_engine=batch_engine,
+            build_grid=build_grid,
+        )
+
+    def run_episode(self, seed: int, max_frames: int = MAX_FRAMES):
+        """plays one round until the bird crashes or max_frames pass"""
+        self.round = seed
+        self.config.images.randomize(random.Random(seed))
+        self.floor = Floor(self.config)
+        self.player = Player(self.config)
+        self.pipes = Pipes(self.config, rng=random.Random(seed))
+        self.score = Score(self.config)
+
+        self.scheduler = self.make_scheduler()
+
+        self.score.reset()
+        self.player.set_mode(PlayerMode.NORMAL)
+
+        frames = 0
+        while frames < max_frames and self.advance():
+            self.scheduler.step()
+            frames += 1
+
+        return EpisodeResult(seed, self.score.score, frames)
+
+    def run(self, seeds, max_frames: int = MAX_FRAMES) -> List[EpisodeResult]:
+        return [self.run_episode(seed, max_frames) for seed in seeds]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless Fuzzy Bird runs")
+    parser.add_argument("--episodes", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-frames", type=int, default=MAX_FRAMES)
+    parser.add_argument(
+        "--decide-every", type=int, default=1, help="frames per decision"
+    )
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=None,
+        help="skip frames after decisions slower than this",
+    )
+    parser.add_argument(
+        "--telemetry", default=None, help="record decisions to this file"
+    )
+    parser.add_argument(
+        "--lookup",
+        type=lambda value: tuple(int(n) for n in value.split(",")),
+        default=None,
+        help="use a decision grid, e.g. 17,31,26,65",
+    )
+    parser.add_argument(
+        "--params", default=None, help="membership breakpoints from optimize"
+    )
+    parser.add_argument(
+        "--exact",
+        action="store_true",
+        help="decide with skfuzzy compute() instead of the vectorized engine",
+    )
+    args = parser.parse_args()
+
+    game = HeadlessFlappy(
+        lookup_resolution=args.lookup,
+        decide_every=args.decide_every,
+        decision_budget_ms=args.budget_ms,
+        telemetry_path=args.telemetry,
+        fuzzy_params=load_params(args.params) if args.params else None,
+        batch_engine=not args.exact,
+    )
+    start = time.perf_counter()
+    results = game.run(
+        range(args.seed, args.seed + args.episodes), args.max_frames
+    )
+    elapsed = time.perf_counter() - start
+    if game.recorder:
+        game.recorder.close()
+
+    for result in results:
+        print(
+            f"seed: {result.seed}, score: {result.score}, frames: {result.frames}"
+        )
+    frames = sum(result.frames for result in results)
+    print(f"{frames} frames in {elapsed:.2f}s ({frames / elapsed:.0f} fps)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .headless import MAX_FRAMES, HeadlessFlappy
+from .population import Population
+from .utils import CACHE_DIR, FuzzyParams, ParamSpace, save_params
+
+CHECKPOINT = os.path.join(CACHE_DIR, "optimize.json")
+# search settings fixed for the lifetime of a checkpoint: they define the
+# fitness function (games, seed, max_frames) and the strategy (size, sigma)
+SETTINGS = {
+    "size": 16,
+    "sigma": 0.05,
+    "games": 8,
+    "seed": 0,
+    "max_frames": MAX_FRAMES,
+}
+
+# per worker process: a headless game whose controller is rebuilt per candidate
+_game: Optional[HeadlessFlappy] = None
+_seeds: Sequence[int] = ()
+_max_frames = MAX_FRAMES
+
+
+def _init_worker(seeds: Sequence[int], max_frames: int) -> None:
+    global _game, _seeds, _max_frames
+    _game = HeadlessFlappy()
+    _seeds = seeds
+    _max_frames = max_frames
+
+
+def evaluate(params: FuzzyParams) -> float:
+    """plays the seeded games with params and returns the mean score plus
+    the mean fraction of frames survived, which breaks ties between scores"""
+    _game.fuzzy_params = params
+    _game.initialize_fuzzy_controller()
+    engine = _game.fuzzy_engine
+    population = Population(
+        _game.config, [lambda inputs: engine.compute(inputs) > 0.5], size=1
+    )
+    fitness = 0.0
+    for seed in _seeds:
+        result = population.run(seed, _max_frames)
+        fitness += result.scores[0] + result.frames[0] / _max_frames
+    return fitness / len(_seeds)
+
+
+class EvolutionStrategy:
+    """(mu/mu, lambda) evolution strategy over a ParamSpace vector.
+
+    Each generation samples ``size`` candidates around the mean, moves the
+    mean to the rank-weighted average of the best half and grows the step
+    size after a generation that found a new best, shrinking it otherwise.
+    The whole state, including the random generator, round-trips through
+    ``state``/``from_state`` so a search can resume from a checkpoint.
+    """
+
+    def __init__(
+        self,
+        mean: np.ndarray,
+        sigma: float = 0.05,
+        size: int = 16,
+        seed: int = 0,
+    ) -> None:
+        self.mean = np.asarray(mean, dtype=float)
+        self.sigma = sigma
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.generation = 0
+        self.best = self.mean.copy()
+        self.best_fitness = -np.inf
+
+        mu = size // 2
+        weights = np.log(mu + 0.5) - np.log(np.arange(1, mu + 1))
+        self.weights = weights / weights.sum()
+
+    def ask(self) -> np.ndarray:
+        noise = self.rng.standard_normal((self.size, len(self.mean)))
+        return np.clip(self.mean + self.sigma * noise, 0, 1)
+
+    def tell(self, candidates: np.ndarray, fitness: Sequence[float]) -> None:
+        order = np.argsort(fitness)[::-1]
+        self.mean = self.weights @ candidates[order[: len(self.weights)]]
+        if fitness[order[0]] > self.best_fitness:
+            self.best_fitness = float(fitness[order[0]])
+            self.best = candidates[order[0]].copy()
+            self.sigma = min(self.sigma * 1.2, 0.3)
+        else:
+            self.sigma = max(self.sigma * 0.85, 1e-3)
+        self.generation += 1
+
+    def state(self) -> dict:
+        return {
+            "generation": self.generation,
+            "mean": self.mean.tolist(),
+            "sigma": self.sigma,
+            "size": self.size,
+            "best": self.best.tolist(),
+            "best_fitness": self.best_fitness,
+            "rng": self.rng.bit_generator.state,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "EvolutionStrategy":
+        search = cls(state["mean"], state["sigma"], state["size"])
+        search.generation = state["generation"]
+        search.best = np.asarray(state["best"])
+        search.best_fitness = state["best_fitness"]
+        search.rng.bit_generator.state = state["rng"]
+        return search
+
+
+def save_checkpoint(
+    search: EvolutionStrategy, path: str, settings: Dict[str, float]
+) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as file:
+        json.dump(dict(search.state(), settings=settings), file)
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path: str) -> Tuple[EvolutionStrategy, Dict[str, float]]:
+    """returns the search and the settings it was started with (None for
+    checkpoints written before settings were stored)"""
+    with open(path) as file:
+        state = json.load(file)
+    return EvolutionStrategy.from_state(state), state.get("settings")
+
+
+def resolve_settings(args, stored: Optional[Dict[str, float]]):
+    """merges the command line with the settings of a resumed checkpoint
+
+    Flags left out take the stored value (or the default for a new search);
+    a flag that contradicts the checkpoint is an error, because it would
+    change the fitness function or the strategy part-way through a search.
+    """
+    given = {name: getattr(args, name) for name in SETTINGS}
+    if stored is None:
+        return {
+            name: SETTINGS[name] if value is None else value
+            for name, value in given.items()
+        }
+    conflicts = [
+        f"--{name.replace('_', '-')} {value} (checkpoint: {stored[name]})"
+        for name, value in given.items()
+        if value is not None and value != stored[name]
+    ]
+    if conflicts:
+        raise SystemExit(
+            f"{args.checkpoint} was started with other settings: "
+            f"{', '.join(conflicts)}; drop the flags or pass --restart"
+        )
+    return dict(stored)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Tune the fuzzy membership breakpoints on headless games"
+    )
+    parser.add_argument("--generations", type=int, default=20)
+    parser.add_argument(
+        "--size", type=int, default=None, help="candidates (default 16)"
+    )
+    parser.add_argument(
+        "--sigma", type=float, default=None, help="initial step (default 0.05)"
+    )
+    parser.add_argument(
+        "--games", type=int, default=None, help="games per score (default 8)"
+    )
+    parser.add_argument("--seed", type=int, default=None, help="default 0")
+    parser.add_argument(
+        "--max-frames", type=int, default=None, help=f"default {MAX_FRAMES}"
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--checkpoint", default=CHECKPOINT)
+    parser.add_argument(
+        "--restart", action="store_true", help="ignore an existing checkpoint"
+    )
+    parser.add_argument("--out", default="best_params.json")
+    args = parser.parse_args()
+
+    space = ParamSpace()
+    if os.path.exists(args.checkpoint) and not args.restart:
+        search, stored = load_checkpoint(args.checkpoint)
+        if stored is None:
+            raise SystemExit(
+                f"{args.checkpoint} does not record its games and seeds, "
+                f"rerun with --restart"
+            )
+        settings = resolve_settings(args, stored)
+        print(f"resuming at generation {search.generation}")
+    else:
+        settings = resolve_settings(args, None)
+        search = EvolutionStrategy(
+            space.encode(space.base),
+            settings["sigma"],
+            settings["size"],
+            settings["seed"],
+        )
+
+    seeds = list(range(settings["seed"], settings["seed"] + settings["games"]))
+    max_frames = settings["max_frames"]
+    with ProcessPoolExecutor(
+        args.workers, initializer=_init_worker, initargs=(seeds, max_frames)
+    ) as pool:
+        if search.generation == 0:
+            # the hand-tuned breakpoints are the baseline to beat
+            search.best_fitness = next(pool.map(evaluate, [space.base]))
+            print(f"baseline fitness: {search.best_fitness:.3f}")
+
+        while search.generation < args.generations:
+            start = time.perf_counter()
+            candidates = search.ask()
+            params = [space.decode(candidate) for candidate in candidates]
+            fitness = list(pool.map(evaluate, params))
+            search.tell(candidates, fitness)
+            save_checkpoint(search, args.checkpoint, settings)
+            save_params(space.decode(search.best), args.out)
+            print(
+                f"generation {search.generation}: best {max(fitness):.3f}, "
+                f"overall {search.best_fitness:.3f}, sigma {search.sigma:.3f} "
+                f"({time.perf_counter() - start:.1f}s)"
+            )
+
+    print(f"best parameters in {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+import argparse
+import random
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+import pygame
+
+from .entities import Floor, Pipes, Player, PlayerMode
+from .flappy import FUZZY_INPUTS
+from .headless import MAX_FRAMES, HeadlessFlappy
+from .utils import (
+    DEFAULT_PARAMS,
+    FuzzyParams,
+    GameConfig,
+    ParamSpace,
+    get_hit_mask,
+    load_params,
+    memoize,
+)
+
+BatchController = Callable[[Dict[str, np.ndarray]], np.ndarray]
+
+
+class PopulationResult(NamedTuple):
+    seed: int
+    variants: np.ndarray
+    scores: np.ndarray
+    frames: np.ndarray
+
+
+@memoize(maxsize=32)
+def mask_array(image: pygame.Surface) -> np.ndarray:
+    """returns the hit mask of image as a (height, width) bool array"""
+    mask = get_hit_mask(image)
+    w, h = mask.get_size()
+    return np.array(
+        [[mask.get_at((x, y)) for x in range(w)] for y in range(h)], dtype=bool
+    )
+
+
+def overlap_table(bird: np.ndarray, other: np.ndarray, dx: int):
+    """returns (dy_min, table) where table[dy - dy_min] tells whether the
+    masks overlap with other placed at (dx, dy) relative to bird"""
+    hb, wb = bird.shape
+    ho, wo = other.shape
+    dy_min = -(ho - 1)
+    table = np.zeros(hb + ho - 1, dtype=bool)
+
+    c0, c1 = max(0, dx), min(wb, dx + wo)
+    if c0 >= c1:
+        return dy_min, table
+
+    # rows[r, s]: bird row r and other row s share a solid column
+    rows = (
+        bird[:, c0:c1].astype(np.int32)
+        @ other[:, c0 - dx : c1 - dx].astype(np.int32).T
+    ) > 0
+    r, s = np.nonzero(rows)
+    table[r - s - dy_min] = True
+    return dy_min, table
+
+
+class Population:
+    """Simulates many birds against one shared pipe sequence.
+
+    Bird state follows ``Player.tick_normal`` but lives in NumPy arrays, the
+    controller runs once per frame for all live birds of a variant, and
+    collisions are looked up in pixel-overlap tables. All birds share the
+    same x, so one table per obstacle and horizontal offset serves the whole
+    population. The frame order matches ``HeadlessFlappy.run_episode``.
+    """
+
+    def __init__(
+        self,
+        config: GameConfig,
+        controllers: Sequence[BatchController],
+        variants: Optional[np.ndarray] = None,
+        size: int = 100,
+    ) -> None:
+        self.config = config
+        self.controllers = controllers
+        if variants is None:
+            variants = np.arange(size) % len(controllers)
+        self.variants = np.asarray(variants)
+        self.tables = {}
+
+    def overlaps(self, bird, image, x, y, by) -> np.ndarray:
+        """which birds at rows by overlap the entity image placed at x, y"""
+        dx = int(x) - self.bird_x
+        key = (id(image), dx)
+        if key not in self.tables:
+            self.tables[key] = overlap_table(bird, mask_array(image), dx)
+        dy_min, table = self.tables[key]
+        idx = int(y) - by - dy_min
+        valid = (idx >= 0) & (idx < len(table))
+        return valid & table[np.where(valid, idx, 0)]
+
+    def collided(self, bird, player, floor, pipes, y) -> np.ndarray:
+        by = np.trunc(y).astype(int)
+        hit = self.overlaps(bird, floor.image, floor.x, floor.y, by)
+
+        left, right = player.x, player.x + player.w
+        for up_pipe, low_pipe in zip(pipes.upper, pipes.lower):
+            if up_pipe.x + up_pipe.w < left:
+                continue
+            if up_pipe.x > right:
+                break
+            hit |= self.overlaps(bird, up_pipe.image, up_pipe.x, up_pipe.y, by)
+            hit |= self.overlaps(
+                bird, low_pipe.image, low_pipe.x, low_pipe.y, by
+            )
+        return hit
+
+    def run(self, seed: int, max_frames: int = MAX_FRAMES) -> PopulationResult:
+        size = len(self.variants)
+        # same sprite choice as HeadlessFlappy.run_episode for this seed
+        self.config.images.randomize(random.Random(seed))
+        floor = Floor(self.config)
+        pipes = Pipes(self.config, rng=random.Random(seed))
+        # one Player supplies the shared geometry and initial state
+        player = Player(self.config)
+        player.set_mode(PlayerMode.NORMAL)
+        # Player keeps the hit mask of its first frame while animating
+        bird = mask_array(self.config.images.player[0])
+        self.bird_x = int(player.x)
+
+        y = np.full(size, float(player.y))
+        vel_y = np.full(size, float(player.vel_y))
+        flapped = np.zeros(size, dtype=bool)
+        pending = np.zeros(size, dtype=bool)
+        alive = np.ones(size, dtype=bool)
+        scores = np.zeros(size, dtype=int)
+        frames = np.full(size, max_frames)
+
+        score = 0
+        for frame in range(max_frames):
+            crashed = alive & self.collided(bird, player, floor, pipes, y)
+            scores[crashed] = score
+            frames[crashed] = frame
+            alive &= ~crashed
+            if not alive.any():
+                break
+
+            for pipe in pipes.upper:
+                if player.crossed(pipe):
+                    score += 1
+
+            # flap: only below the ceiling, like Player.flap
+            flap = pending & alive & (y > player.min_y)
+            vel_y[flap] = player.flap_acc
+            flapped |= flap
+
+            floor.update()
+            pipes.update()
+
+            # Player.tick_normal for every live bird
+            accelerate = alive & (vel_y < player.max_vel_y) & ~flapped
+            vel_y[accelerate] += player.acc_y
+            flapped[alive] = False
+            y[alive] = np.clip(
+                y[alive] + vel_y[alive], player.min_y, player.max_y
+            )
+
+            pending = self.decide(player, pipes, y, vel_y, alive)
+
+        scores[alive] = score
+        return PopulationResult(seed, self.variants, scores, frames)
+
+    def decide(self, player, pipes, y, vel_y, alive) -> np.ndarray:
+        distance_to_pipe, pipe_gap_y = 300, self.config.window.height / 2
+        for pipe_upper in pipes.upper:
+            if pipe_upper.x + pipe_upper.w > player.x:
+                distance_to_pipe = pipe_upper.x - player.x
+                pipe_gap_y = pipe_upper.y + pipe_upper.h + pipes.pipe_gap / 2
+                break
+
+        decisions = np.zeros(len(y), dtype=bool)
+        for variant, controller in enumerate(self.controllers):
+            idx = np.flatnonzero(alive & (self.variants == variant))
+            if not len(idx):
+                continue
+            inputs = dict(
+                zip(
+                    FUZZY_INPUTS,
+                    (
+                        y[idx],
+                        vel_y[idx],
+                        np.full(len(idx), float(distance_to_pipe)),
+                        pipe_gap_y - y[idx],
+                    ),
+                )
+            )
+            decisions[idx] = controller(inputs)
+        return decisions
+
+
+def variant_params(
+    paths: Sequence[str], size: int, sigma: float, seed: int
+) -> List[FuzzyParams]:
+    """returns the breakpoints read from paths (the defaults without any),
+    topped up to size with random perturbations of the first of them"""
+    variants = [load_params(path) for path in paths] or [DEFAULT_PARAMS]
+    space = ParamSpace()
+    base = space.encode(variants[0])
+    rng = np.random.default_rng(seed)
+    while len(variants) < size:
+        step = sigma * rng.standard_normal(len(space))
+        variants.append(space.decode(base + step))
+    return variants
+
+
+def make_controller(
+    game: HeadlessFlappy, params: FuzzyParams, lookup_resolution=None
+) -> BatchController:
+    """returns the batch controller of game rebuilt with params"""
+    game.setup_controller(
+        lookup_resolution,
+        fuzzy_params=params,
+        batch_engine=True,
+        build_grid=True,
+    )
+    if game.decision_grid is not None:
+        return game.decision_grid.lookup_batch
+    engine = game.fuzzy_engine
+    return lambda inputs: engine.compute(inputs) > 0.5
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuzzy Bird population run")
+    parser.add_argument(
+        "--birds",
+        type=int,
+        default=20,
+        help="one controller variant per bird",
+    )
+    parser.add_argument(
+        "--params",
+        nargs="+",
+        default=[],
+        help="membership breakpoints of the first variants, from optimize",
+    )
+    parser.add_argument(
+        "--sigma",
+        type=float,
+        default=0.05,
+        help="perturbation of the remaining variants, in universe widths",
+    )
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-frames", type=int, default=MAX_FRAMES)
+    parser.add_argument(
+        "--lookup",
+        type=lambda value: tuple(int(n) for n in value.split(",")),
+        default=None,
+        help="use a decision grid per variant, e.g. 17,31,26,65",
+    )
+    args = parser.parse_args()
+
+    game = HeadlessFlappy()
+    variants = variant_params(args.params, args.birds, args.sigma, args.seed)
+    controllers = [
+        make_controller(game, params, args.lookup) for params in variants
+    ]
+
+    population = Population(game.config, controllers, size=len(controllers))
+    start = time.perf_counter()
+    result = population.run(args.seed, args.max_frames)
+    elapsed = time.perf_counter() - start
+
+    # birds of one variant fly identically, so there is one bird per variant
+    sources = list(args.params) or ["default"]
+    sources += ["perturbed"] * (len(variants) - len(sources))
+    width = max(len(source) for source in sources)
+    order = np.lexsort((-result.frames, -result.scores))
+    print(f"variant  {'source':{width}s}  score  frames")
+    for variant in order[: args.top]:
+        print(
+            f"{variant:7d}  {sources[variant]:{width}s}  "
+            f"{result.scores[variant]:5d}  {result.frames[variant]:6d}"
+        )
+
+    frames = int(result.frames.max())
+    print(
+        f"{len(variants)} variants, mean score: {result.scores.mean():.1f}, "
+        f"mean frames: {result.frames.mean():.0f}"
+    )
+    print(f"{frames} steps in {elapsed:.2f}s ({frames / elapsed:.0f} steps/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import argparse
+import sys
+
+import numpy as np
+
+from .headless import HeadlessFlappy
+from .utils import load_params, load_telemetry, load_telemetry_metadata
+
+
+def replay(game, records: np.ndarray) -> np.ndarray:
+    """feeds recorded inputs back through the controller
+
+    Returns the indices of records whose decision differs from the recording.
+    """
+    decisions = np.fromiter(
+        (
+            game.fuzzy_logic_controller(
+                record["bird_y"],
+                record["bird_vel_y"],
+                record["distance_to_pipe"],
+                record["height_difference"],
+            )
+            for record in records
+        ),
+        dtype=bool,
+        count=len(records),
+    )
+    return np.flatnonzero(decisions != records["should_flap"])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check recorded decisions against the current controller"
+    )
+    parser.add_argument("path", help="telemetry file written by FlightRecorder")
+    parser.add_argument(
+        "--lookup",
+        type=lambda value: tuple(int(n) for n in value.split(",")),
+        default=None,
+        help="replay against a decision grid, e.g. 17,31,26,65 "
+        "(default: the grid used while recording, if any)",
+    )
+    parser.add_argument(
+        "--params",
+        default=None,
+        help="membership breakpoints to replay against "
+        "(default: the ones stored in the recording)",
+    )
+    parser.add_argument("--show", type=int, default=10)
+    args = parser.parse_args()
+
+    records = load_telemetry(args.path)
+    metadata = load_telemetry_metadata(args.path)
+    if args.params:
+        params = load_params(args.params)
+    else:
+        # recordings without metadata were made with the default breakpoints
+        params = metadata.get("params")
+    lookup = args.lookup or metadata.get("lookup")
+    game = HeadlessFlappy(
+        lookup_resolution=lookup, fuzzy_params=params, batch_engine=False
+    )
+    mismatches = replay(game, records)
+
+    print(f"{len(records)} decisions, {len(mismatches)} differ")
+    for record in records[mismatches[: args.show]]:
+        print(
+            f"round: {record['round']}, frame: {record['frame']}, "
+            f"bird_y: {record['bird_y']}, bird_vel_y: {record['bird_vel_y']}, "
+            f"distance_to_pipe: {record['distance_to_pipe']}, "
+            f"height_difference: {record['height_difference']}, "
+            f"recorded: {record['should_flap']}"
+        )
+    sys.exit(1 if len(mismatches) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,28 @@
+from .assets import ASSETS, AssetCache
+from .decision_grid import CACHE_DIR, DEFAULT_RESOLUTION, DecisionGrid
+from .fuzzy_engine import BatchFuzzyEngine
+from .fuzzy_params import (
+    DEFAULT_PARAMS,
+    FuzzyParams,
+    ParamSpace,
+    load_params,
+    save_params,
+)
 from .game_config import GameConfig
 from .images import Images
+from .profiler import FrameProfiler
+from .renderer import Renderer
+from .rotation_cache import RotationCache
+from .scheduler import ControllerScheduler
 from .sounds import Sounds
-from .utils import clamp, get_hit_mask, pixel_collision
+from .telemetry import FlightRecorder, load_telemetry, load_telemetry_metadata
+from .utils import (
+    clamp,
+    flip_image,
+    get_debug_font,
+    get_hit_mask,
+    memoize,
+    pixel_collision,
+    scale_image,
+)
 from .window import Window
@@ -0,0 +1,89 @@
+import glob
+import json
+import os
+import zipfile
+from typing import Dict, Optional
+
+import pygame
+
+INDEX = "index.json"
+
+
+class AssetCache:
+    """Process-wide cache of decoded sprites and sounds.
+
+    Every file is read and decoded once; later requests, new rounds and
+    ``Images.randomize`` get the same objects from memory. Optionally the
+    files come from a pack built with ``build_pack``, which stores sprites as
+    raw RGBA pixels and sounds as PCM samples, so startup opens a single file
+    and skips PNG and Ogg decoding.
+    """
+
+    def __init__(self, pack_path: Optional[str] = None) -> None:
+        self.images: Dict = {}
+        self.sounds: Dict = {}
+        self.pack = None
+        self.index = {}
+        if pack_path:
+            self.open_pack(pack_path)
+
+    def open_pack(self, path: str) -> None:
+        self.pack = zipfile.ZipFile(path)
+        self.index = json.loads(self.pack.read(INDEX))
+
+    def load_image(self, path: str) -> pygame.Surface:
+        entry = self.index.get(path)
+        if entry is None:
+            return pygame.image.load(path)
+        data = self.pack.read(path)
+        return pygame.image.frombytes(data, tuple(entry["size"]), "RGBA")
+
+    def image(self, path: str, mode: str = "alpha") -> pygame.Surface:
+        """returns a decoded sprite
+
+        ``mode`` is "alpha" (convert_alpha), "opaque" (convert) or "raw" (as
+        decoded, for headless runs without a display).
+        """
+        key = (path, mode)
+        image = self.images.get(key)
+        if image is None:
+            image = self.load_image(path)
+            if mode == "alpha":
+                image = image.convert_alpha()
+            elif mode == "opaque":
+                image = image.convert()
+            self.images[key] = image
+        return image
+
+    def sound(self, path: str) -> pygame.mixer.Sound:
+        sound = self.sounds.get(path)
+        if sound is None:
+            entry = self.index.get(path)
+            # samples are only usable if the mixer runs in the packed format
+            if entry and tuple(entry["format"]) == pygame.mixer.get_init():
+                sound = pygame.mixer.Sound(buffer=self.pack.read(path))
+            else:
+                sound = pygame.mixer.Sound(path)
+            self.sounds[path] = sound
+        return sound
+
+
+def build_pack(out_path: str, root: str = "assets") -> None:
+    """packs every sprite (as raw RGBA) and sound (as PCM samples in the
+    default mixer format) into one archive"""
+    pygame.mixer.init()
+    index = {}
+    with zipfile.ZipFile(out_path, "w", zipfile.ZIP_STORED) as pack:
+        for path in sorted(glob.glob(os.path.join(root, "sprites", "*.png"))):
+            path = path.replace(os.sep, "/")
+            image = pygame.image.load(path)
+            pack.writestr(path, pygame.image.tobytes(image, "RGBA"))
+            index[path] = {"size": image.get_size()}
+        for path in sorted(glob.glob(os.path.join(root, "audio", "*"))):
+            path = path.replace(os.sep, "/")
+            pack.writestr(path, pygame.mixer.Sound(path).get_raw())
+            index[path] = {"format": pygame.mixer.get_init()}
+        pack.writestr(INDEX, json.dumps(index))
+
+
+ASSETS = AssetCache(os.environ.get("ASSET_PACK"))
@@ -0,0 +1,200 @@
+import hashlib
+import os
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+from skfuzzy import control as ctrl
+
+from .fuzzy_engine import BatchFuzzyEngine
+
+# grid points per input, in the order of the controller's inputs; builds in
+# seconds, finer grids trade build time for fewer disagreements
+DEFAULT_RESOLUTION = (17, 31, 26, 65)
+# next to the package, so the cache is found from any working directory
+PACKAGE_ROOT = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+CACHE_DIR = os.path.join(PACKAGE_ROOT, ".cache")
+
+
+def rule_base_hash(control_system: ctrl.ControlSystem) -> str:
+    """returns a digest of universes, membership functions and rules"""
+    digest = hashlib.sha1()
+    variables = list(control_system.antecedents) + list(
+        control_system.consequents
+    )
+    for var in sorted(variables, key=lambda v: v.label):
+        digest.update(var.label.encode())
+        digest.update(np.ascontiguousarray(var.universe, np.float64).tobytes())
+        for label, term in var.terms.items():
+            digest.update(label.encode())
+            digest.update(np.ascontiguousarray(term.mf, np.float64).tobytes())
+    for rule in control_system.rules:
+        # repr(rule) rounds consequent weights, so hash them at full precision
+        digest.update(str(rule.antecedent).encode())
+        for consequent in rule.consequent:
+            digest.update(consequent.term.full_label.encode())
+            digest.update(np.float64(consequent.weight).tobytes())
+        for func in (rule.and_func, rule.or_func):
+            digest.update(f"{func.__module__}.{func.__name__}".encode())
+    return digest.hexdigest()
+
+
+class DecisionGrid:
+    """Precomputed flap/no-flap table over the bounded input universes.
+
+    Every input universe is sampled at ``resolution`` evenly spaced points and
+    the controller decision at each grid node is stored as a ``.npy`` file in
+    ``cache_dir``. The file name contains a hash of the rule base and the
+    resolution, so the table is rebuilt only when rules, membership functions
+    or resolution change; otherwise it is memory-mapped from disk. Lookups
+    snap each input to its nearest grid node.
+
+    Building takes a while, so it happens only with ``build=True``, normally
+    from the offline ``python -m src.build_grid`` step; otherwise a missing
+    table raises ``FileNotFoundError``.
+    """
+
+    def __init__(
+        self,
+        control_system: ctrl.ControlSystem,
+        labels: Sequence[str],
+        resolution: Sequence[int] = DEFAULT_RESOLUTION,
+        cache_dir: str = CACHE_DIR,
+        threshold: float = 0.5,
+        build: bool = False,
+    ) -> None:
+        if len(resolution) != len(labels):
+            raise ValueError(
+                f"Expected {len(labels)} grid sizes, got {len(resolution)}"
+            )
+        self.labels = tuple(labels)
+        self.resolution = tuple(int(n) for n in resolution)
+        self.threshold = threshold
+        self.engine = BatchFuzzyEngine(control_system)
+
+        antecedents = self.engine.antecedents
+        self.lower = tuple(
+            float(antecedents[label].universe.min()) for label in self.labels
+        )
+        self.upper = tuple(
+            float(antecedents[label].universe.max()) for label in self.labels
+        )
+        self.scale = tuple(
+            (n - 1) / (hi - lo)
+            for n, lo, hi in zip(self.resolution, self.lower, self.upper)
+        )
+
+        size = "x".join(str(n) for n in self.resolution)
+        key = rule_base_hash(control_system)[:16]
+        self.path = os.path.join(cache_dir, f"decision_grid_{key}_{size}.npy")
+        if not os.path.exists(self.path):
+            if not build:
+                raise FileNotFoundError(
+                    f"No decision grid at {self.path}, build it first with "
+                    f"`python -m src.build_grid --resolution "
+                    f"{','.join(str(n) for n in self.resolution)}` "
+                    f"(plus --params if the game uses them)"
+                )
+            self.build()
+        # plain ndarray view of the mapping: avoids memmap scalar overhead
+        self.table = np.asarray(np.load(self.path, mmap_mode="r"))
+
+    def axes(self) -> Tuple[np.ndarray, ...]:
+        """returns the grid node values of every input"""
+        return tuple(
+            np.linspace(lo, hi, n)
+            for lo, hi, n in zip(self.lower, self.upper, self.resolution)
+        )
+
+    def build(self, chunk_size: int = 1 << 16) -> None:
+        """evaluates the controller on every grid node and writes the table"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp.npy"
+        table = np.lib.format.open_memmap(
+            tmp_path, mode="w+", dtype=np.uint8, shape=self.resolution
+        )
+        flat = table.reshape(-1)
+        axes = self.axes()
+        for start in range(0, flat.size, chunk_size):
+            idx = np.unravel_index(
+                np.arange(start, min(start + chunk_size, flat.size)),
+                self.resolution,
+            )
+            inputs = {
+                label: axis[i] for label, axis, i in zip(self.labels, axes, idx)
+            }
+            flat[start : start + chunk_size] = (
+                self.engine.compute(inputs) > self.threshold
+            )
+        table.flush()
+        del flat, table
+        os.replace(tmp_path, self.path)
+
+    def index(self, *values: float) -> Tuple[int, ...]:
+        """returns the nearest grid node for a single state"""
+        return tuple(
+            min(max(int((v - lo) * s + 0.5), 0), n - 1)
+            for v, lo, s, n in zip(
+                values, self.lower, self.scale, self.resolution
+            )
+        )
+
+    def lookup(self, *values: float) -> bool:
+        """returns the tabulated decision for a single state"""
+        return bool(self.table.item(self.index(*values)))
+
+    def lookup_batch(self, inputs: Dict[str, np.ndarray]) -> np.ndarray:
+        """returns the tabulated decisions for arrays of states"""
+        idx = tuple(
+            np.clip(
+                np.floor((np.asarray(inputs[label]) - lo) * s + 0.5),
+                0,
+                n - 1,
+            ).astype(int)
+            for label, lo, s, n in zip(
+                self.labels, self.lower, self.scale, self.resolution
+            )
+        )
+        return self.table[idx].astype(bool)
+
+    def max_disagreement(
+        self,
+        simulation: ctrl.ControlSystemSimulation,
+        samples: int = 1000,
+        seed: int = 0,
+    ) -> Dict[str, float]:
+        """compares the table with exact compute() on random states
+
+        Returns the number of sampled states whose decision differs and the
+        largest distance of the exact output from the threshold among them,
+        i.e. how confidently wrong the table can be at this resolution.
+        """
+        rng = np.random.default_rng(seed)
+        inputs = {
+            label: rng.uniform(lo, hi, samples)
+            for label, lo, hi in zip(self.labels, self.lower, self.upper)
+        }
+        decisions = self.lookup_batch(inputs)
+        label = self.engine.consequent.label
+
+        mismatches = 0
+        max_margin = 0.0
+        for i in range(samples):
+            for name in self.labels:
+                simulation.input[name] = inputs[name][i]
+            try:
+                simulation.compute()
+                exact = simulation.output.get(label, 0)
+            except ValueError:
+                exact = 0
+            if (exact > self.threshold) != decisions[i]:
+                mismatches += 1
+                max_margin = max(max_margin, float(abs(exact - self.threshold)))
+
+        return {
+            "samples": samples,
+            "mismatches": mismatches,
+            "mismatch_rate": mismatches / samples,
+            "max_margin": max_margin,
+        }
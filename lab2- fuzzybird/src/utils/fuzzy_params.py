@@ -0,0 +1,109 @@
+import json
+import os
+from typing import Dict, List
+
+import numpy as np
+
+# triangular membership breakpoints of the controller inputs
+FuzzyParams = Dict[str, Dict[str, List[float]]]
+
+# (lower, upper) bounds of every input universe
+UNIVERSES = {
+    "bird_y": (0, 512),
+    "bird_vel_y": (-15, 15),
+    "distance_to_pipe": (0, 500),
+    "height_difference": (-512, 512),
+}
+
+DEFAULT_PARAMS: FuzzyParams = {
+    "bird_y": {
+        "high": [0, 0, 200],
+        "medium": [150, 256, 362],
+        "low": [300, 512, 512],
+    },
+    "bird_vel_y": {
+        "rising_fast": [-15, -15, -5],
+        "rising_slowly": [-10, -5, 0],
+        "stable": [-2, 0, 2],
+        "falling_slowly": [0, 5, 10],
+        "falling_fast": [5, 15, 15],
+    },
+    "distance_to_pipe": {
+        "close": [0, 0, 150],
+        "medium": [100, 250, 400],
+        "far": [350, 500, 500],
+    },
+    "height_difference": {
+        "much_below": [-512, -512, -100],
+        "below": [-150, -50, 0],
+        "level": [-25, 0, 25],
+        "above": [0, 50, 150],
+        "much_above": [100, 512, 512],
+    },
+}
+
+
+def load_params(path: str) -> FuzzyParams:
+    """reads breakpoints written by save_params, defaults fill the gaps"""
+    with open(path) as file:
+        loaded = json.load(file)
+    params = {var: dict(terms) for var, terms in DEFAULT_PARAMS.items()}
+    for var, terms in loaded.items():
+        if var not in params:
+            raise ValueError(f"Unknown fuzzy input {var!r} in {path}")
+        for term, points in terms.items():
+            if term not in params[var] or len(points) != 3:
+                raise ValueError(f"Invalid term {var}.{term} in {path}")
+            params[var][term] = [float(p) for p in points]
+    return params
+
+
+def save_params(params: FuzzyParams, path: str) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as file:
+        json.dump(params, file, indent=2)
+    os.replace(tmp, path)
+
+
+class ParamSpace:
+    """Maps breakpoints to a flat vector for the optimizer and back.
+
+    Breakpoints sitting on a universe bound form the shoulders of the outer
+    terms and stay fixed; every other breakpoint is a free coordinate.
+    Vectors are scaled by the universe width, so one step size fits all
+    inputs.
+    """
+
+    def __init__(self, base: FuzzyParams = DEFAULT_PARAMS) -> None:
+        self.base = base
+        self.slots = []
+        for var, terms in base.items():
+            lower, upper = UNIVERSES[var]
+            for term, points in terms.items():
+                for i, point in enumerate(points):
+                    if point not in (lower, upper):
+                        self.slots.append((var, term, i))
+        self.lower = np.array([UNIVERSES[var][0] for var, _, _ in self.slots])
+        self.upper = np.array([UNIVERSES[var][1] for var, _, _ in self.slots])
+        self.scale = self.upper - self.lower
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def encode(self, params: FuzzyParams) -> np.ndarray:
+        values = np.array([params[var][term][i] for var, term, i in self.slots])
+        return (values - self.lower) / self.scale
+
+    def decode(self, vector: np.ndarray) -> FuzzyParams:
+        """returns valid breakpoints: clipped to the universe and sorted"""
+        values = self.lower + np.clip(vector, 0, 1) * self.scale
+        params = {
+            var: {term: list(points) for term, points in terms.items()}
+            for var, terms in self.base.items()
+        }
+        for (var, term, i), value in zip(self.slots, values):
+            params[var][term][i] = round(float(value), 2)
+        for terms in params.values():
+            for term, points in terms.items():
+                terms[term] = sorted(points)
+        return params
@@ -1,8 +1,10 @@
 import os
+from typing import Optional
 
 import pygame
 
 from .images import Images
+from .renderer import Renderer
 from .sounds import Sounds
 from .window import Window
 
@@ -10,8 +12,8 @@ from .window import Window
 class GameConfig:
     def __init__(
         self,
-        screen: pygame.Surface,
-        clock: pygame.time.Clock,
+        screen: Optional[pygame.Surface],
+        clock: Optional[pygame.time.Clock],
         fps: int,
         window: Window,
         images: Images,
@@ -24,6 +26,13 @@ class GameConfig:
         self.images = images
         self.sounds = sounds
         self.debug = os.environ.get("DEBUG", False)
+        self.renderer = Renderer(screen) if screen else None
 
-    def tick(self) -> None:
-        self.clock.tick(self.fps)
+    @property
+    def headless(self) -> bool:
+        """True when there is no window to draw on"""
+        return self.screen is None
+
+    def tick(self, fps: Optional[float] = None) -> None:
+        if self.clock:
+            self.clock.tick(self.fps if fps is None else fps)
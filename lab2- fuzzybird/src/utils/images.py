@@ -1,9 +1,12 @@
 import random
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 import pygame
 
+from .assets import ASSETS
 from .constants import BACKGROUNDS, PIPES, PLAYERS
+from .rotation_cache import RotationCache
+from .utils import flip_image
 
 
 class Images:
@@ -14,46 +17,46 @@ class Images:
     background: pygame.Surface
     player: Tuple[pygame.Surface]
     pipe: Tuple[pygame.Surface]
+    player_rotations: RotationCache
 
-    def __init__(self) -> None:
+    def __init__(self, headless: bool = False) -> None:
+        # converting needs a display mode, headless runs keep raw surfaces
+        self.headless = headless
         self.numbers = list(
-            (
-                pygame.image.load(f"assets/sprites/{num}.png").convert_alpha()
-                for num in range(10)
-            )
+            (self.load(f"assets/sprites/{num}.png") for num in range(10))
         )
 
         # game over sprite
-        self.game_over = pygame.image.load(
-            "assets/sprites/gameover.png"
-        ).convert_alpha()
+        self.game_over = self.load("assets/sprites/gameover.png")
         # welcome_message sprite for welcome screen
-        self.welcome_message = pygame.image.load(
-            "assets/sprites/message.png"
-        ).convert_alpha()
+        self.welcome_message = self.load("assets/sprites/message.png")
         # base (ground) sprite
-        self.base = pygame.image.load("assets/sprites/base.png").convert_alpha()
+        self.base = self.load("assets/sprites/base.png")
         self.randomize()
 
-    def randomize(self):
+    def load(self, path: str, alpha: bool = True) -> pygame.Surface:
+        if self.headless:
+            return ASSETS.image(path, "raw")
+        return ASSETS.image(path, "alpha" if alpha else "opaque")
+
+    def randomize(self, rng: Optional[random.Random] = None):
+        # seeded runs pass their own generator
+        rng = rng or random
         # select random background sprites
-        rand_bg = random.randint(0, len(BACKGROUNDS) - 1)
+        rand_bg = rng.randint(0, len(BACKGROUNDS) - 1)
         # select random player sprites
-        rand_player = random.randint(0, len(PLAYERS) - 1)
+        rand_player = rng.randint(0, len(PLAYERS) - 1)
         # select random pipe sprites
-        rand_pipe = random.randint(0, len(PIPES) - 1)
+        rand_pipe = rng.randint(0, len(PIPES) - 1)
 
-        self.background = pygame.image.load(BACKGROUNDS[rand_bg]).convert()
+        self.background = self.load(BACKGROUNDS[rand_bg], alpha=False)
         self.player = (
-            pygame.image.load(PLAYERS[rand_player][0]).convert_alpha(),
-            pygame.image.load(PLAYERS[rand_player][1]).convert_alpha(),
-            pygame.image.load(PLAYERS[rand_player][2]).convert_alpha(),
+            self.load(PLAYERS[rand_player][0]),
+            self.load(PLAYERS[rand_player][1]),
+            self.load(PLAYERS[rand_player][2]),
         )
+        self.player_rotations = RotationCache(self.player)
         self.pipe = (
-            pygame.transform.flip(
-                pygame.image.load(PIPES[rand_pipe]).convert_alpha(),
-                False,
-                True,
-            ),
-            pygame.image.load(PIPES[rand_pipe]).convert_alpha(),
+            flip_image(self.load(PIPES[rand_pipe]), False, True),
+            self.load(PIPES[rand_pipe]),
         )
@@ -0,0 +1,171 @@
+import atexit
+import tempfile
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pygame
+
+from .utils import get_debug_font
+
+# stages of Flappy.play, in the order they run
+STAGES = (
+    "events",
+    "collision",
+    "controller",
+    "pipes",
+    "player",
+    "blit",
+    "display",
+    "wait",
+)
+
+# histogram bin edges in ms, log-spaced from 1 µs to 1 s
+HISTOGRAM_EDGES = np.logspace(-3, 3, 61)
+
+
+class FrameProfiler:
+    """Times the stages of every frame.
+
+    ``mark(stage)`` charges the time since the previous mark to ``stage``,
+    ``end_frame()`` closes the frame. Per-frame samples (ms, one column per
+    stage) of the last ``window`` frames are kept in a fixed-size ring that
+    feeds the p50/p99 shown by ``draw_hud``, and per-stage histograms with
+    log-spaced bins are kept for the whole run, so memory stays constant.
+    Only with a ``path`` are all samples kept: they are spilled to a
+    temporary file every ``chunk`` frames and written as CSV or NPZ (by
+    extension) when the profiler is closed, also at interpreter exit.
+    """
+
+    def __init__(
+        self,
+        stages: Sequence[str] = STAGES,
+        path: Optional[str] = None,
+        window: int = 300,
+        hud_every: int = 15,
+        chunk: int = 4096,
+    ) -> None:
+        self.stages = tuple(stages)
+        self.index = {stage: i for i, stage in enumerate(self.stages)}
+        self.path = path
+        self.window = window
+        self.hud_every = hud_every
+
+        self.ring = np.zeros((window, len(self.stages)), dtype=np.float32)
+        self.frames = 0
+        self.histograms = np.zeros(
+            (len(self.stages), len(HISTOGRAM_EDGES) + 1), dtype=np.int64
+        )
+        self.current = [0.0] * len(self.stages)
+        self.last = time.perf_counter()
+        self.hud = []
+        self.chunk = None
+        if path:
+            self.chunk = np.zeros((chunk, len(self.stages)), dtype=np.float32)
+            self.chunk_frames = 0
+            self.spill = tempfile.TemporaryFile()
+            atexit.register(self.close)
+
+    def begin(self) -> None:
+        """starts timing a new frame, discarding time spent outside frames"""
+        self.current = [0.0] * len(self.stages)
+        self.last = time.perf_counter()
+
+    def mark(self, stage: str) -> None:
+        now = time.perf_counter()
+        self.current[self.index[stage]] += (now - self.last) * 1000
+        self.last = now
+
+    def end_frame(self) -> None:
+        row = self.ring[self.frames % self.window]
+        row[:] = self.current
+        bins = np.searchsorted(HISTOGRAM_EDGES, row)
+        self.histograms[np.arange(len(self.stages)), bins] += 1
+        self.frames += 1
+        if self.chunk is not None:
+            self.chunk[self.chunk_frames] = row
+            self.chunk_frames += 1
+            if self.chunk_frames == len(self.chunk):
+                self.chunk.tofile(self.spill)
+                self.chunk_frames = 0
+        self.begin()
+
+    def recent(self) -> np.ndarray:
+        """returns the samples of the last ``window`` frames, in ring order"""
+        return self.ring[: min(self.frames, self.window)]
+
+    def samples(self) -> np.ndarray:
+        """returns all samples of the run in frame order (needs a ``path``)"""
+        self.spill.seek(0)
+        spilled = np.fromfile(self.spill, dtype=np.float32)
+        return np.concatenate(
+            [
+                spilled.reshape(-1, len(self.stages)),
+                self.chunk[: self.chunk_frames],
+            ]
+        )
+
+    def percentiles(self) -> Dict[str, Tuple[float, float]]:
+        """returns (p50, p99) in ms per stage over the recent frames"""
+        recent = self.recent()
+        if not len(recent):
+            return {}
+        p50, p99 = np.percentile(recent, [50, 99], axis=0)
+        return {
+            stage: (float(p50[i]), float(p99[i]))
+            for i, stage in enumerate(self.stages)
+        }
+
+    def fps(self) -> float:
+        recent = self.recent()
+        total = float(recent.sum())
+        return len(recent) * 1000 / total if total else 0.0
+
+    def draw_hud(self, renderer) -> None:
+        """blits p50/p99 per stage and the achieved fps to the top left
+        corner, re-rendering the text every ``hud_every`` frames"""
+        if self.frames % self.hud_every == 0 or not self.hud:
+            font = get_debug_font()
+            lines = [f"{self.fps():.0f} fps"] + [
+                f"{stage}: {p50:.2f} / {p99:.2f} ms"
+                for stage, (p50, p99) in self.percentiles().items()
+            ]
+            self.hud = [
+                font.render(line, True, (255, 255, 255)) for line in lines
+            ]
+        y = 0
+        for text in self.hud:
+            background = pygame.Rect(0, y, text.get_width(), text.get_height())
+            renderer.mark(
+                pygame.draw.rect(renderer.screen, (0, 0, 0), background)
+            )
+            renderer.blit(text, (0, y))
+            y += text.get_height()
+
+    def export(self, path: str) -> None:
+        samples = self.samples()
+        if path.endswith(".npz"):
+            np.savez(
+                path,
+                stages=np.array(self.stages),
+                samples=samples,
+                histogram_edges=HISTOGRAM_EDGES,
+                histograms=self.histograms,
+            )
+        else:
+            np.savetxt(
+                path,
+                samples,
+                fmt="%.4f",
+                delimiter=",",
+                header=",".join(self.stages),
+                comments="",
+            )
+
+    def close(self) -> None:
+        if self.path:
+            self.export(self.path)
+            self.path = None
+            self.spill.close()
+            self.chunk = None
+            atexit.unregister(self.close)
@@ -0,0 +1,49 @@
+from typing import List
+
+import pygame
+
+
+class Renderer:
+    """Tracks the screen regions drawn each frame and updates only those.
+
+    Everything drawn in a frame goes through ``blit``/``mark``, so at the end
+    of the frame ``update`` pushes just the union of this frame's and the
+    previous frame's rects to the display. Because nothing outside last
+    frame's rects was touched, the background only has to be restored under
+    them (``restore``) instead of being blitted over the whole window.
+    """
+
+    def __init__(self, screen: pygame.Surface) -> None:
+        self.screen = screen
+        self.previous: List[pygame.Rect] = []
+        self.current: List[pygame.Rect] = []
+        self.full_redraw = True
+
+    def invalidate(self) -> None:
+        """forces the next frame to redraw and update the whole window"""
+        self.full_redraw = True
+
+    def mark(self, rect: pygame.Rect) -> None:
+        self.current.append(rect)
+
+    def blit(self, image: pygame.Surface, dest, area=None) -> pygame.Rect:
+        rect = self.screen.blit(image, dest, area)
+        self.current.append(rect)
+        return rect
+
+    def restore(self, background: pygame.Surface) -> None:
+        """redraws the background where the previous frame drew something"""
+        if self.full_redraw:
+            self.screen.blit(background, (0, 0))
+            return
+        for rect in self.previous:
+            self.screen.blit(background, rect, rect)
+
+    def update(self) -> None:
+        if self.full_redraw:
+            pygame.display.update()
+            self.full_redraw = False
+        else:
+            pygame.display.update(self.previous + self.current)
+        self.previous = self.current
+        self.current = []
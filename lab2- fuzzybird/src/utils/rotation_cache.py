@@ -0,0 +1,36 @@
+from collections import OrderedDict
+from typing import Sequence
+
+import pygame
+
+
+class RotationCache:
+    """Bounded LRU cache of rotated copies of a set of animation frames.
+
+    Entries are keyed by ``(frame index, angle)`` and hold the rotated
+    surface, so it is not rebuilt while the entry lives. Only drawing uses
+    it: collisions test the unrotated frame's hit mask.
+    """
+
+    def __init__(
+        self, frames: Sequence[pygame.Surface], max_size: int = 384
+    ) -> None:
+        self.frames = frames
+        self.max_size = max_size
+        self.entries = OrderedDict()
+
+    def get(self, idx: int, rot: float) -> pygame.Surface:
+        key = (idx, rot)
+        image = self.entries.get(key)
+        if image is not None:
+            self.entries.move_to_end(key)
+            return image
+
+        image = pygame.transform.rotate(self.frames[idx], rot)
+        self.entries[key] = image
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        return image
+
+    def clear(self) -> None:
+        self.entries.clear()
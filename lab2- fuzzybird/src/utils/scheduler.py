@@ -0,0 +1,104 @@
+import asyncio
+import time
+from collections import deque
+from typing import Callable, Iterator, Optional
+
+
+class ControllerScheduler:
+    """Runs controller decisions in step with the game's frames.
+
+    A decision is taken at most once per frame: every ``every`` frames, and,
+    when ``budget_ms`` is set, only after the time spent in the previous
+    decision has been paid back at ``budget_ms`` per frame. Frames that get
+    no decision are counted in ``skipped``. Results wait in a bounded queue
+    until the game loop applies them; if the loop falls behind, the oldest
+    result is discarded and counted in ``dropped``.
+
+    ``step()`` takes a decision synchronously (used by headless runs), while
+    ``start()`` runs the same logic in an asyncio task that wakes once per
+    ``frame()`` signal instead of spinning on ``asyncio.sleep(0)``.
+    """
+
+    def __init__(
+        self,
+        decide: Callable[[], bool],
+        every: int = 1,
+        budget_ms: Optional[float] = None,
+        max_pending: int = 1,
+    ) -> None:
+        if every < 1:
+            raise ValueError("every must be at least 1")
+        self.decide = decide
+        self.every = every
+        self.budget_ms = budget_ms
+        self.pending = deque()
+        self.max_pending = max_pending
+
+        self.frame_count = 0
+        self.decisions = 0
+        self.skipped = 0
+        self.dropped = 0
+        self.last_ms = 0.0
+        self._debt_ms = 0.0
+        self._frame_event = None
+        self._task = None
+
+    def due(self) -> bool:
+        """True if the current frame gets a decision"""
+        if self.budget_ms is not None and self._debt_ms > 0:
+            self._debt_ms -= self.budget_ms
+            return False
+        return self.frame_count % self.every == 0
+
+    def step(self) -> None:
+        """advances one frame, deciding if the frame is due"""
+        if self.due():
+            start = time.perf_counter()
+            action = self.decide()
+            self.last_ms = (time.perf_counter() - start) * 1000
+            if self.budget_ms is not None:
+                self._debt_ms = max(self.last_ms - self.budget_ms, 0.0)
+
+            self.decisions += 1
+            if len(self.pending) >= self.max_pending:
+                self.pending.popleft()
+                self.dropped += 1
+            self.pending.append(action)
+        else:
+            self.skipped += 1
+        self.frame_count += 1
+
+    def actions(self) -> Iterator[bool]:
+        """yields and removes the decisions waiting to be applied"""
+        while self.pending:
+            yield self.pending.popleft()
+
+    def start(self) -> None:
+        """starts deciding in an asyncio task driven by frame()"""
+        self._frame_event = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    def frame(self) -> None:
+        """signals the task that a frame has been simulated"""
+        if self._frame_event.is_set():
+            # the task has not caught up with the previous frame
+            self.skipped += 1
+            self.frame_count += 1
+        self._frame_event.set()
+
+    async def _run(self) -> None:
+        while True:
+            await self._frame_event.wait()
+            self._frame_event.clear()
+            self.step()
+
+    async def stop(self) -> None:
+        """cancels the task and waits for it to finish"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
@@ -2,6 +2,15 @@ import sys
 
 import pygame
 
+from .assets import ASSETS
+
+
+class SilentSound:
+    """stand-in for pygame.mixer.Sound when running without a mixer"""
+
+    def play(self, *args, **kwargs) -> None:
+        pass
+
 
 class Sounds:
     die: pygame.mixer.Sound
@@ -10,14 +19,20 @@ class Sounds:
     swoosh: pygame.mixer.Sound
     wing: pygame.mixer.Sound
 
-    def __init__(self) -> None:
+    def __init__(self, mute: bool = False) -> None:
+        if mute:
+            silent = SilentSound()
+            self.die = self.hit = self.point = silent
+            self.swoosh = self.wing = silent
+            return
+
         if "win" in sys.platform:
             ext = "wav"
         else:
             ext = "ogg"
 
-        self.die = pygame.mixer.Sound(f"assets/audio/die.{ext}")
-        self.hit = pygame.mixer.Sound(f"assets/audio/hit.{ext}")
-        self.point = pygame.mixer.Sound(f"assets/audio/point.{ext}")
-        self.swoosh = pygame.mixer.Sound(f"assets/audio/swoosh.{ext}")
-        self.wing = pygame.mixer.Sound(f"assets/audio/wing.{ext}")
+        self.die = ASSETS.sound(f"assets/audio/die.{ext}")
+        self.hit = ASSETS.sound(f"assets/audio/hit.{ext}")
+        self.point = ASSETS.sound(f"assets/audio/point.{ext}")
+        self.swoosh = ASSETS.sound(f"assets/audio/swoosh.{ext}")
+        self.wing = ASSETS.sound(f"assets/audio/wing.{ext}")
@@ -0,0 +1,133 @@
+import atexit
+import json
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+MAGIC = b"FBTL"
+
+# one row per controller decision
+TELEMETRY_DTYPE = np.dtype(
+    [
+        ("round", "<u4"),
+        ("frame", "<u4"),
+        # controller inputs, kept at full precision so replays are exact
+        ("bird_y", "<f8"),
+        ("bird_vel_y", "<f8"),
+        ("distance_to_pipe", "<f8"),
+        ("height_difference", "<f8"),
+        # controller output
+        ("should_flap", "?"),
+        # player and next pipe state
+        ("player_rot", "<f4"),
+        ("pipe_x", "<f4"),
+        ("pipe_gap_y", "<f4"),
+    ]
+)
+
+
+class FlightRecorder:
+    """Records controller telemetry into a preallocated structured buffer.
+
+    With a ``path``, the buffer is appended to that file in one write every
+    time it fills up and when the recorder is closed (also at interpreter
+    exit). Without a path it is a ring buffer keeping only the last
+    ``capacity`` decisions, e.g. for inspecting a crash in memory.
+
+    The file starts with ``MAGIC``, a little-endian uint32 length and a JSON
+    header holding the description of ``TELEMETRY_DTYPE`` and ``metadata``
+    (e.g. the controller's membership breakpoints, so a replay can rebuild
+    the same controller), followed by raw records.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        capacity: int = 4096,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.path = path
+        self.buffer = np.zeros(capacity, dtype=TELEMETRY_DTYPE)
+        self.size = 0
+        self.total = 0
+        self.file = None
+        if path:
+            self.file = open(path, "wb")
+            header = json.dumps(
+                {"dtype": TELEMETRY_DTYPE.descr, "metadata": metadata or {}}
+            ).encode()
+            self.file.write(MAGIC)
+            self.file.write(np.uint32(len(header)).tobytes())
+            self.file.write(header)
+            atexit.register(self.close)
+
+    def record(
+        self,
+        round: int,
+        frame: int,
+        inputs: Sequence[float],
+        should_flap: bool,
+        player_rot: float,
+        pipe_x: float,
+        pipe_gap_y: float,
+    ) -> None:
+        self.buffer[self.size] = (
+            round,
+            frame,
+            *inputs,
+            should_flap,
+            player_rot,
+            pipe_x,
+            pipe_gap_y,
+        )
+        self.size += 1
+        self.total += 1
+        if self.size == len(self.buffer):
+            if self.file:
+                self.flush()
+            else:
+                self.size = 0
+
+    def flush(self) -> None:
+        if self.file and self.size:
+            self.file.write(self.buffer[: self.size].tobytes())
+            self.file.flush()
+            self.size = 0
+
+    def records(self) -> np.ndarray:
+        """returns the buffered records in recording order"""
+        if self.file or self.total < len(self.buffer):
+            return self.buffer[: self.size].copy()
+        return np.roll(self.buffer, -self.size)
+
+    def close(self) -> None:
+        if self.file:
+            self.flush()
+            self.file.close()
+            self.file = None
+            atexit.unregister(self.close)
+
+
+def _read_header(file, path: str) -> Dict[str, Any]:
+    if file.read(len(MAGIC)) != MAGIC:
+        raise ValueError(f"{path} is not a telemetry file")
+    length = int(np.frombuffer(file.read(4), dtype="<u4")[0])
+    header = json.loads(file.read(length))
+    # files from before metadata was recorded hold only the dtype
+    if isinstance(header, list):
+        return {"dtype": header, "metadata": {}}
+    return header
+
+
+def load_telemetry(path: str) -> np.ndarray:
+    """reads a file written by FlightRecorder"""
+    with open(path, "rb") as file:
+        descr = _read_header(file, path)["dtype"]
+        dtype = np.dtype([tuple(field) for field in descr])
+        return np.fromfile(file, dtype=dtype)
+
+
+def load_telemetry_metadata(path: str) -> Dict[str, Any]:
+    """reads the metadata stored in a FlightRecorder file header"""
+    with open(path, "rb") as file:
+        return _read_header(file, path)["metadata"]
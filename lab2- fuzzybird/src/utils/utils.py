@@ -1,9 +1,9 @@
-from functools import wraps
-from typing import List
+from collections import OrderedDict
+from functools import partial, wraps
 
 import pygame
 
-HitMaskType = List[List[bool]]
+HitMaskType = pygame.mask.Mask
 
 
 def clamp(n: float, minn: float, maxn: float) -> float:
@@ -11,33 +11,53 @@ def clamp(n: float, minn: float, maxn: float) -> float:
     return max(min(maxn, n), minn)
 
 
-def memoize(func):
-    cache = {}
+def memoize(func=None, *, maxsize=None):
+    """caches results by arguments, evicting the least recently used entry
+    once maxsize is reached"""
+    if func is None:
+        return partial(memoize, maxsize=maxsize)
+
+    cache = OrderedDict()
 
     @wraps(func)
     def wrapper(*args, **kwargs):
         key = (args, frozenset(kwargs.items()))
-        if key not in cache:
-            cache[key] = func(*args, **kwargs)
-        return cache[key]
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+        cache[key] = result = func(*args, **kwargs)
+        if maxsize is not None and len(cache) > maxsize:
+            cache.popitem(last=False)
+        return result
 
     return wrapper
 
 
+@memoize(maxsize=64)
+def scale_image(image: pygame.Surface, size) -> pygame.Surface:
+    """returns a scaled copy of image, shared between callers"""
+    return pygame.transform.scale(image, size)
+
+
+@memoize(maxsize=64)
+def flip_image(
+    image: pygame.Surface, xbool: bool, ybool: bool
+) -> pygame.Surface:
+    """returns a flipped copy of image, shared between callers"""
+    return pygame.transform.flip(image, xbool, ybool)
+
+
 @memoize
+def get_debug_font() -> pygame.font.Font:
+    """returns the font used for debug labels, created once"""
+    return pygame.font.SysFont("Arial", 13, True)
+
+
+@memoize(maxsize=512)
 def get_hit_mask(image: pygame.Surface) -> HitMaskType:
-    """returns a hit mask using an image's alpha."""
-    return list(
-        (
-            list(
-                (
-                    bool(image.get_at((x, y))[3])
-                    for y in range(image.get_height())
-                )
-            )
-            for x in range(image.get_width())
-        )
-    )
+    """returns a bit-packed hit mask using an image's alpha."""
+    # threshold 0: every pixel that is not fully transparent is solid
+    return pygame.mask.from_surface(image, 0)
 
 
 def pixel_collision(
@@ -47,16 +67,8 @@ def pixel_collision(
     hitmask2: HitMaskType,
 ):
     """Checks if two objects collide and not just their rects"""
-    rect = rect1.clip(rect2)
-
-    if rect.width == 0 or rect.height == 0:
+    if not rect1.colliderect(rect2):
         return False
 
-    x1, y1 = rect.x - rect1.x, rect.y - rect1.y
-    x2, y2 = rect.x - rect2.x, rect.y - rect2.y
-
-    for x in range(rect.width):
-        for y in range(rect.height):
-            if hitmask1[x1 + x][y1 + y] and hitmask2[x2 + x][y2 + y]:
-                return True
-    return False
+    offset = (rect2.x - rect1.x, rect2.y - rect1.y)
+    return hitmask1.overlap(hitmask2, offset) is not None
@@ -1,7 +1,99 @@
-from sklearn.cluster import KMeans, AgglomerativeClustering
+import numpy as np
+from scipy import sparse
+from sklearn.cluster import KMeans, AgglomerativeClustering, MiniBatchKMeans
 from sklearn.mixture import GaussianMixture
 from sklearn.preprocessing import StandardScaler
 
+from data_loader import is_sparse, matrix_values
+
+# powyżej tej liczby użytkowników tryb 'auto' używa ScalableAgglomerative
+EXACT_AGGLOMERATIVE_LIMIT = 10000
+# GMM wymaga gęstych danych; powyżej tej liczby komórek (użytkownicy x filmy) nie jest dopasowywany
+GMM_DENSE_LIMIT = 50_000_000
+
+
+def scale_values(values, keep_sparse=False):
+    """
+    Standaryzuje surowe oceny (wiersze to użytkownicy).
+
+    Dla macierzy rzadkiej z keep_sparse=True kolumny są tylko dzielone przez odchylenie
+    standardowe (bez odejmowania średniej), więc wynik pozostaje rzadki. Przesunięcie nie
+    zmienia odległości euklidesowych, dlatego K-Means daje te same klastry. Algorytmy
+    wymagające gęstych danych dostają pełną standaryzację.
+
+    :param values: Oceny (numpy, DataFrame lub scipy.sparse).
+    :param keep_sparse: Czy zachować reprezentację rzadką.
+    :return: Skalowana macierz (numpy lub scipy.sparse).
+    """
+    if sparse.issparse(values):
+        if keep_sparse:
+            return StandardScaler(with_mean=False).fit_transform(values)
+        return StandardScaler().fit_transform(values.toarray())
+    return StandardScaler().fit_transform(values)
+
+
+def scale_matrix(matrix, keep_sparse=False):
+    """
+    Standaryzuje macierz użytkownik-film (zob. scale_values).
+
+    :param matrix: Macierz użytkownik-film (DataFrame lub SparseUserItemMatrix).
+    :param keep_sparse: Czy zachować reprezentację rzadką.
+    :return: Skalowana macierz (numpy lub scipy.sparse).
+    """
+    return scale_values(matrix_values(matrix), keep_sparse)
+
+
+def fit_scaling(values):
+    """
+    Standaryzuje surowe oceny jednym dopasowaniem StandardScaler bez odejmowania średniej,
+    więc macierz rzadka zostaje rzadka. Odjęcie zwróconego przesunięcia (center_dense)
+    daje pełną standaryzację, jak scale_values, bez ponownego dopasowania.
+
+    :param values: Oceny (numpy, DataFrame lub scipy.sparse).
+    :return: Oceny podzielone przez odchylenie standardowe kolumn (numpy lub scipy.sparse)
+        oraz ich średnie kolumn (mean_ / scale_).
+    """
+    scaler = StandardScaler(with_mean=False).fit(values)
+    return scaler.transform(values), scaler.mean_ / scaler.scale_
+
+
+def center_dense(scaled, center):
+    """
+    :return: Gęsta, w pełni standaryzowana kopia macierzy z fit_scaling.
+    """
+    dense = scaled.toarray() if sparse.issparse(scaled) else np.asarray(scaled, dtype=np.float64)
+    return dense - center
+
+
+def check_dense_size(shape, limit=GMM_DENSE_LIMIT):
+    """
+    Sprawdza, czy gęsta kopia macierzy o danym kształcie mieści się w limicie.
+
+    :raises ValueError: Gdy liczba komórek przekracza limit.
+    """
+    if shape[0] * shape[1] > limit:
+        raise ValueError(
+            f"Macierz {shape} jest za duża na gęstą kopię (limit {limit} komórek)")
+
+
+def preview_rows(scaled_matrix, n=5):
+    """
+    :return: Pierwsze wiersze skalowanej macierzy jako tablica numpy (do wydruku).
+    """
+    rows = scaled_matrix[:n]
+    return rows.toarray() if hasattr(rows, 'toarray') else rows
+
+
+def fit_kmeans(scaled_matrix, n_clusters=3):
+    """
+    Dopasowuje K-Means do już skalowanej macierzy.
+
+    :return: Model K-Means oraz etykiety klastrów.
+    """
+    kmeans = KMeans(n_clusters=n_clusters, random_state=42)
+    kmeans.fit(scaled_matrix)
+    return kmeans, kmeans.labels_
+
 
 def perform_kmeans_clustering(matrix, n_clusters=3):
     """
@@ -11,40 +103,262 @@ def perform_kmeans_clustering(matrix, n_clusters=3):
     :param n_clusters: Liczba klastrów.
     :return: Model K-Means oraz etykiety klastrów.
     """
-    scaler = StandardScaler()
-    scaled_matrix = scaler.fit_transform(matrix)
+    scaled_matrix = scale_matrix(matrix, keep_sparse=True)
 
     print("=== Skalowana macierz dla K-Means ===")
-    print(scaled_matrix[:5])
+    print(preview_rows(scaled_matrix))
     print(f"Rozmiar skalowanej macierzy: {scaled_matrix.shape}\n")
 
-    kmeans = KMeans(n_clusters=n_clusters, random_state=42)
-    kmeans.fit(scaled_matrix)
-    labels = kmeans.labels_
+    return fit_kmeans(scaled_matrix, n_clusters)
+
+
+def cluster_kmeans(scaled, center, n_clusters=3):
+    """
+    Dopasowuje K-Means wprost do macierzy z fit_scaling (bez odejmowania średniej, jak
+    perform_kmeans_clustering dla macierzy rzadkiej).
 
-    return kmeans, labels
+    :param scaled: Oceny skalowane przez fit_scaling (numpy lub scipy.sparse).
+    :param center: Średnie kolumn skalowanych ocen (nieużywane).
+    :return: Model K-Means oraz etykiety klastrów.
+    """
+    return fit_kmeans(scaled, n_clusters)
 
 
-def perform_agglomerative_clustering(matrix, n_clusters=3, distance_metric='cosine'):
+class ScalableAgglomerative:
+    """
+    Klasteryzacja hierarchiczna z metryką kosinusową i średnim połączeniem (average linkage)
+    w ograniczonej pamięci.
+
+    Dla wektorów znormalizowanych do długości 1 odległość kosinusowa to 1 - u·v, więc
+    średnia odległość między grupami A i B wynosi 1 - S_A·S_B / (|A| |B|), gdzie S to suma
+    wektorów grupy. Wystarczą więc sumy i liczności grup, a nie macierz odległości
+    wszystkich par użytkowników.
+
+    1. Dane są standaryzowane i normalizowane porcjami (chunk_size wierszy naraz).
+    2. Użytkownicy są wstępnie grupowani w n_micro mikroklastrów (MiniBatchKMeans na
+       wektorach jednostkowych, czyli sferyczny K-Means), jak w BIRCH.
+    3. Mikroklastry są łączone dokładnym średnim połączeniem liczonym z sum i liczności,
+       z wagą równą liczbie użytkowników.
+
+    Pamięć to O(chunk_size * filmy + n_micro^2). Gdy użytkowników jest nie więcej niż
+    n_micro, każdy jest osobnym mikroklastrem i wynik odpowiada AgglomerativeClustering
+    (metric='cosine', linkage='average') z dokładnością do remisów.
+    """
+
+    def __init__(self, n_clusters=3, n_micro=1000, chunk_size=10000, random_state=42):
+        """
+        :param n_clusters: Liczba klastrów.
+        :param n_micro: Liczba mikroklastrów łączonych hierarchicznie.
+        :param chunk_size: Liczba wierszy standaryzowanych naraz.
+        :param random_state: Ziarno MiniBatchKMeans.
+        """
+        self.n_clusters = n_clusters
+        self.n_micro = n_micro
+        self.chunk_size = chunk_size
+        self.random_state = random_state
+
+    def unit_chunks(self, values, mean, scale):
+        """
+        :return: Kolejne porcje standaryzowanych wierszy znormalizowanych do długości 1.
+        """
+        for start in range(0, values.shape[0], self.chunk_size):
+            chunk = values[start:start + self.chunk_size]
+            chunk = chunk.toarray() if sparse.issparse(chunk) else np.asarray(chunk, dtype=np.float64)
+            chunk = (chunk - mean) / scale
+            norms = np.linalg.norm(chunk, axis=1, keepdims=True)
+            # wiersz zerowy zostaje zerowy, tak jak w cosine_distances
+            yield np.divide(chunk, norms, out=np.zeros_like(chunk), where=norms > 0)
+
+    def micro_clusters(self, values, mean, scale):
+        """
+        :return: Numer mikroklastra każdego użytkownika, sumy wektorów i liczności mikroklastrów.
+        """
+        n_users = values.shape[0]
+        if n_users <= self.n_micro:
+            sums = np.vstack(list(self.unit_chunks(values, mean, scale)))
+            return np.arange(n_users), sums, np.ones(n_users)
+
+        micro = MiniBatchKMeans(n_clusters=self.n_micro, batch_size=self.chunk_size,
+                                init='random', random_state=self.random_state, n_init=1)
+        for chunk in self.unit_chunks(values, mean, scale):
+            if len(chunk) >= self.n_micro:
+                micro.partial_fit(chunk)
+        if not hasattr(micro, 'cluster_centers_'):
+            micro.fit(np.vstack(list(self.unit_chunks(values, mean, scale))))
+
+        labels = []
+        sums = np.zeros((self.n_micro, values.shape[1]))
+        for chunk in self.unit_chunks(values, mean, scale):
+            codes = micro.predict(chunk)
+            membership = sparse.csr_matrix(
+                (np.ones(len(codes)), (codes, np.arange(len(codes)))), shape=(self.n_micro, len(codes)))
+            sums += membership @ chunk
+            labels.append(codes)
+        labels = np.concatenate(labels)
+        counts = np.bincount(labels, minlength=self.n_micro).astype(np.float64)
+        # puste mikroklastry nie biorą udziału w łączeniu
+        used = np.flatnonzero(counts)
+        remap = np.full(self.n_micro, -1)
+        remap[used] = np.arange(len(used))
+        return remap[labels], sums[used], counts[used]
+
+    @staticmethod
+    def average_linkage(sums, counts, n_clusters):
+        """
+        Łączy grupy średnim połączeniem kosinusowym, aż zostanie n_clusters grup.
+
+        :param sums: Sumy wektorów jednostkowych grup.
+        :param counts: Liczności grup.
+        :return: Numer klastra (0..n_clusters-1) każdej grupy.
+        """
+        sums, counts = sums.copy(), counts.astype(np.float64)
+        size = len(counts)
+        distances = 1 - (sums @ sums.T) / np.outer(counts, counts)
+        np.fill_diagonal(distances, np.inf)
+        nearest = np.argmin(distances, axis=1)
+        nearest_distance = distances[np.arange(size), nearest]
+        owner = np.arange(size)
+        alive = np.ones(size, dtype=bool)
+        active = size
+
+        while active > n_clusters:
+            i = int(np.argmin(nearest_distance))
+            j = int(nearest[i])
+            i, j = min(i, j), max(i, j)
+            sums[i] += sums[j]
+            counts[i] += counts[j]
+            owner[owner == j] = i
+            active -= 1
+
+            alive[j] = False
+            distances[j, :] = np.inf
+            distances[:, j] = np.inf
+            nearest_distance[j] = np.inf
+            row = np.full(size, np.inf)
+            row[alive] = 1 - (sums[alive] @ sums[i]) / (counts[alive] * counts[i])
+            row[i] = np.inf
+            distances[i, :] = row
+            distances[:, i] = row
+
+            stale = np.flatnonzero(alive & ((nearest == i) | (nearest == j)))
+            stale = stale[stale != i]
+            if len(stale):
+                nearest[stale] = np.argmin(distances[stale], axis=1)
+                nearest_distance[stale] = distances[stale, nearest[stale]]
+            closer = alive & (row < nearest_distance)
+            nearest[closer] = i
+            nearest_distance[closer] = row[closer]
+            if active > 1:
+                nearest[i] = np.argmin(row)
+                nearest_distance[i] = row[nearest[i]]
+
+        _, labels = np.unique(owner, return_inverse=True)
+        return labels
+
+    def fit_predict(self, values, center=None):
+        """
+        :param values: Nieskalowane oceny (numpy lub scipy.sparse), wiersze to użytkownicy,
+            albo oceny z fit_scaling, gdy podano center.
+        :param center: Średnie kolumn ocen z fit_scaling; wtedy skaler nie jest dopasowywany.
+        :return: Etykiety klastrów.
+        """
+        if center is None:
+            # with_mean=False przyjmuje macierz rzadką, a mean_ i scale_ są liczone tak samo
+            scaler = StandardScaler(with_mean=False).fit(values)
+            mean, scale = scaler.mean_, scaler.scale_
+        else:
+            mean, scale = center, 1.0
+        micro_labels, sums, counts = self.micro_clusters(values, mean, scale)
+        self.micro_labels_ = micro_labels
+        self.n_micro_ = len(counts)
+        self.labels_ = self.average_linkage(sums, counts, self.n_clusters)[micro_labels]
+        return self.labels_
+
+
+def agglomerative_mode(n_users, distance_metric='cosine', mode='auto'):
+    """
+    :return: Tryb 'exact' albo 'scalable'; 'auto' wybiera 'scalable' powyżej
+        EXACT_AGGLOMERATIVE_LIMIT użytkowników przy metryce kosinusowej.
+    """
+    if mode == 'auto':
+        large = n_users > EXACT_AGGLOMERATIVE_LIMIT
+        mode = 'scalable' if large and distance_metric == 'cosine' else 'exact'
+    if mode == 'scalable' and distance_metric != 'cosine':
+        raise ValueError("Tryb 'scalable' obsługuje tylko metrykę 'cosine'")
+    return mode
+
+
+def fit_agglomerative(scaled_matrix, n_clusters=3, distance_metric='cosine', mode='auto'):
+    """
+    Dopasowuje Agglomerative Clustering do już skalowanej macierzy. W trybie 'scalable'
+    macierz powinna być surowa, bo ScalableAgglomerative standaryzuje ją porcjami.
+
+    :param mode: 'exact', 'scalable' lub 'auto' (jak w perform_agglomerative_clustering).
+    :return: Model Agglomerative Clustering oraz etykiety klastrów.
+    """
+    mode = agglomerative_mode(scaled_matrix.shape[0], distance_metric, mode)
+    if mode == 'scalable':
+        agglomerative = ScalableAgglomerative(n_clusters=n_clusters)
+    else:
+        agglomerative = AgglomerativeClustering(n_clusters=n_clusters, metric=distance_metric, linkage='average')
+    return agglomerative, agglomerative.fit_predict(scaled_matrix)
+
+
+def cluster_agglomerative(scaled, center, n_clusters=3, distance_metric='cosine', mode='auto'):
+    """
+    Dopasowuje Agglomerative Clustering do macierzy z fit_scaling: tryb skalowalny czyta ją
+    porcjami (rzadką), tryb dokładny dostaje gęstą kopię wycentrowaną przez center.
+
+    :param scaled: Oceny skalowane przez fit_scaling (numpy lub scipy.sparse).
+    :param center: Średnie kolumn skalowanych ocen.
+    :return: Model Agglomerative Clustering oraz etykiety klastrów.
+    """
+    mode = agglomerative_mode(scaled.shape[0], distance_metric, mode)
+    if mode == 'scalable':
+        agglomerative = ScalableAgglomerative(n_clusters=n_clusters)
+        return agglomerative, agglomerative.fit_predict(scaled, center=center)
+    return fit_agglomerative(center_dense(scaled, center), n_clusters, distance_metric, mode)
+
+
+def perform_agglomerative_clustering(matrix, n_clusters=3, distance_metric='cosine', mode='auto'):
     """
     Wykonuje klasteryzację za pomocą Hierarchical (Agglomerative) Clustering.
 
     :param matrix: Macierz użytkownik-film.
     :param n_clusters: Liczba klastrów.
     :param distance_metric: Metryka odległości ('euclidean' lub 'cosine').
+    :param mode: 'exact' (AgglomerativeClustering na pełnej macierzy), 'scalable'
+        (ScalableAgglomerative, tylko metryka kosinusowa) lub 'auto' (scalable powyżej
+        EXACT_AGGLOMERATIVE_LIMIT użytkowników).
     :return: Model Agglomerative Clustering oraz etykiety klastrów.
     """
-    scaler = StandardScaler()
-    scaled_matrix = scaler.fit_transform(matrix)
+    mode = agglomerative_mode(matrix.shape[0], distance_metric, mode)
+    if mode == 'scalable':
+        # ScalableAgglomerative standaryzuje porcjami, bez gęstej kopii całej macierzy
+        agglomerative, labels = fit_agglomerative(matrix_values(matrix), n_clusters, distance_metric, mode)
+
+        print("=== Agglomerative Clustering (tryb skalowalny) ===")
+        print(f"Rozmiar macierzy: {matrix.shape}, liczba mikroklastrów: {agglomerative.n_micro_}\n")
+        return agglomerative, labels
+
+    scaled_matrix = scale_matrix(matrix)
 
     print("=== Skalowana macierz dla Agglomerative Clustering ===")
-    print(scaled_matrix[:5])
+    print(preview_rows(scaled_matrix))
     print(f"Rozmiar skalowanej macierzy: {scaled_matrix.shape}\n")
 
-    agglomerative = AgglomerativeClustering(n_clusters=n_clusters, metric=distance_metric, linkage='average')
-    labels = agglomerative.fit_predict(scaled_matrix)
+    return fit_agglomerative(scaled_matrix, n_clusters, distance_metric, mode)
+
+
+def fit_gmm(scaled_matrix, n_clusters=3, covariance_type='full'):
+    """
+    Dopasowuje GMM do już skalowanej macierzy.
 
-    return agglomerative, labels
+    :return: Model GMM oraz etykiety klastrów.
+    """
+    gmm = GaussianMixture(n_components=n_clusters, covariance_type=covariance_type, random_state=42)
+    gmm.fit(scaled_matrix)
+    return gmm, gmm.predict(scaled_matrix)
 
 
 def perform_gmm_clustering(matrix, n_clusters=3, covariance_type='full'):
@@ -55,16 +369,26 @@ def perform_gmm_clustering(matrix, n_clusters=3, covariance_type='full'):
     :param n_clusters: Liczba klastrów.
     :param covariance_type: Typ macierzy kowariancji ('full', 'tied', 'diag', 'spherical').
     :return: Model GMM oraz etykiety klastrów.
+    :raises ValueError: Gdy macierz przekracza GMM_DENSE_LIMIT komórek.
     """
-    scaler = StandardScaler()
-    scaled_matrix = scaler.fit_transform(matrix)
+    check_dense_size(matrix.shape)
+    scaled_matrix = scale_matrix(matrix)
 
     print("=== Skalowana macierz dla GMM ===")
-    print(scaled_matrix[:5])
+    print(preview_rows(scaled_matrix))
     print(f"Rozmiar skalowanej macierzy: {scaled_matrix.shape}\n")
 
-    gmm = GaussianMixture(n_components=n_clusters, covariance_type=covariance_type, random_state=42)
-    gmm.fit(scaled_matrix)
-    labels = gmm.predict(scaled_matrix)
+    return fit_gmm(scaled_matrix, n_clusters, covariance_type)
+
+
+def cluster_gmm(scaled, center, n_clusters=3, covariance_type='full'):
+    """
+    Dopasowuje GMM do gęstej kopii macierzy z fit_scaling, wycentrowanej przez center.
 
-    return gmm, labels
+    :param scaled: Oceny skalowane przez fit_scaling (numpy lub scipy.sparse).
+    :param center: Średnie kolumn skalowanych ocen.
+    :return: Model GMM oraz etykiety klastrów.
+    :raises ValueError: Gdy macierz przekracza GMM_DENSE_LIMIT komórek.
+    """
+    check_dense_size(scaled.shape)
+    return fit_gmm(center_dense(scaled, center), n_clusters, covariance_type)
@@ -1,5 +1,19 @@
+import hashlib
 import json
+import os
+import re
+import shutil
+
+import numpy as np
 import pandas as pd
+from scipy import sparse
+
+CACHE_DIR = '.cache'
+CACHE_VERSION = 1
+# znaki struktury JSON istotne przy pomijaniu wartości oraz reszta napisu do cudzysłowu zamykającego
+STRUCTURAL = re.compile(r'[\[\]{}"]')
+STRING_TAIL = re.compile(r'(?:[^"\\]|\\.)*"', re.S)
+
 
 def load_data(filepath):
     """
@@ -37,6 +51,370 @@ def load_data(filepath):
     return df
 
 
+def iter_people(filepath, read_size=1 << 20):
+    """
+    Czyta kolejne obiekty z tablicy "Osoby" bez wczytywania całego pliku. W pamięci jest
+    tylko bufor o rozmiarze rzędu read_size znaków oraz jedna osoba.
+
+    Plik jest czytany jako obiekt JSON klucz po kluczu: wchodzimy tylko do tablicy pod
+    kluczem najwyższego poziomu "Osoby", a wartości pozostałych kluczy są pomijane bez
+    dekodowania (z uwzględnieniem zagnieżdżeń i napisów), więc tekst '"Osoby"' w nazwisku,
+    tytule czy innym kluczu nie myli parsera.
+
+    :param filepath: Ścieżka do pliku JSON.
+    :param read_size: Liczba znaków czytanych z pliku naraz.
+    :return: Generator słowników osób (z kluczami 'nazwa' i 'filmy').
+    """
+    decoder = json.JSONDecoder()
+    with open(filepath, 'r', encoding='utf-8') as file:
+        buffer = ''
+        pos = 0
+        eof = False
+
+        def fill():
+            nonlocal buffer, pos, eof
+            chunk = file.read(read_size)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+
+        def peek():
+            # następny znak po białych znakach ('' na końcu pliku)
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in ' \t\r\n':
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    return buffer[pos:pos + 1]
+                fill()
+
+        def expect(char):
+            nonlocal pos
+            if peek() != char:
+                raise ValueError(f"Niepoprawny JSON w {filepath}: oczekiwano '{char}'")
+            pos += 1
+
+        def decode():
+            # wartość zaczynająca się w pos; liczba na końcu bufora mogła zostać przecięta
+            nonlocal pos
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buffer, pos)
+                    if end < len(buffer) or eof:
+                        pos = end
+                        return value
+                except json.JSONDecodeError:
+                    # wartość nie zmieściła się jeszcze w buforze
+                    if eof:
+                        raise
+                fill()
+
+        def skip():
+            # pomija tablicę lub obiekt, śledząc tylko nawiasy i granice napisów
+            nonlocal pos
+            if buffer[pos] not in '[{':
+                decode()
+                return
+            depth = 0
+            while True:
+                match = STRUCTURAL.search(buffer, pos)
+                if match is None:
+                    if eof:
+                        raise ValueError(f"Niekompletny JSON w {filepath}")
+                    pos = len(buffer)
+                    fill()
+                    continue
+                pos = match.start()
+                if buffer[pos] == '"':
+                    end = STRING_TAIL.match(buffer, pos + 1)
+                    if end is None:
+                        if eof:
+                            raise ValueError(f"Niekompletny JSON w {filepath}")
+                        fill()
+                        continue
+                    pos = end.end()
+                    continue
+                depth += 1 if buffer[pos] in '[{' else -1
+                pos += 1
+                if depth == 0:
+                    return
+
+        # przejście do tablicy pod kluczem "Osoby" obiektu najwyższego poziomu
+        expect('{')
+        while True:
+            char = peek()
+            if char == '}':
+                return
+            if char == ',':
+                pos += 1
+                continue
+            if char != '"':
+                raise ValueError(f"Niepoprawny JSON w {filepath}: oczekiwano klucza")
+            key = decode()
+            expect(':')
+            if key == 'Osoby' and peek() == '[':
+                pos += 1
+                break
+            if not peek():
+                raise ValueError(f"Niekompletny JSON w {filepath}")
+            skip()
+
+        while True:
+            char = peek()
+            if char == ',':
+                pos += 1
+                continue
+            if char == ']':
+                return
+            if not char:
+                raise ValueError(f"Niekompletna tablica 'Osoby' w {filepath}")
+            yield decode()
+
+
+def aggregate_ratings(user_codes, film_codes, sums, counts):
+    """
+    Łączy powtórzone pary (użytkownik, film), sumując oceny i ich liczby.
+
+    :return: Posortowane po (użytkownik, film) kody, sumy ocen i liczby ocen.
+    """
+    if not len(user_codes):
+        return user_codes, film_codes, sums, counts
+    order = np.lexsort((film_codes, user_codes))
+    user_codes, film_codes = user_codes[order], film_codes[order]
+    sums, counts = sums[order], counts[order]
+    changed = (user_codes[1:] != user_codes[:-1]) | (film_codes[1:] != film_codes[:-1])
+    starts = np.flatnonzero(np.concatenate(([True], changed)))
+    return (
+        user_codes[starts],
+        film_codes[starts],
+        np.add.reduceat(sums, starts),
+        np.add.reduceat(counts, starts),
+    )
+
+
+def load_data_streaming(filepath, chunk_rows=1 << 18, read_size=1 << 20):
+    """
+    Ładuje dane z pliku JSON strumieniowo, z ograniczonym zużyciem pamięci. Oceny trafiają
+    od razu do tablic numpy (kody użytkownika i filmu, suma i liczba ocen), a duplikaty są
+    łączone po każdym bloku chunk_rows ocen i raz na końcu. Wynik jest taki sam jak z
+    load_data, ale kolumny 'Użytkownik' i 'Film' są kategoryczne.
+
+    :param filepath: Ścieżka do pliku JSON.
+    :param chunk_rows: Liczba ocen w bloku przed łączeniem duplikatów.
+    :param read_size: Liczba znaków czytanych z pliku naraz.
+    :return: Pandas DataFrame ze średnimi ocenami, posortowany po użytkowniku i filmie.
+    """
+    user_index, film_index = {}, {}
+    block_users = np.empty(chunk_rows, dtype=np.int32)
+    block_films = np.empty(chunk_rows, dtype=np.int32)
+    block_ratings = np.empty(chunk_rows, dtype=np.float64)
+    blocks = []
+    size = 0
+    total = 0
+
+    def flush():
+        blocks.append(aggregate_ratings(
+            block_users[:size].copy(), block_films[:size].copy(),
+            block_ratings[:size].copy(), np.ones(size, dtype=np.int32),
+        ))
+
+    for osoba in iter_people(filepath, read_size):
+        user = user_index.setdefault(osoba['nazwa'], len(user_index))
+        for film in osoba.get('filmy', []):
+            if size == chunk_rows:
+                flush()
+                size = 0
+            block_users[size] = user
+            block_films[size] = film_index.setdefault(film['film'], len(film_index))
+            block_ratings[size] = film['ocena']
+            size += 1
+            total += 1
+    flush()
+
+    # kody według kolejności alfabetycznej, jak w groupby z load_data
+    users = np.array(list(user_index), dtype=object)
+    films = np.array(list(film_index), dtype=object)
+    user_order, film_order = np.argsort(users), np.argsort(films)
+    user_rank = np.empty(len(users), dtype=np.int32)
+    user_rank[user_order] = np.arange(len(users))
+    film_rank = np.empty(len(films), dtype=np.int32)
+    film_rank[film_order] = np.arange(len(films))
+
+    columns = [np.concatenate(column) for column in zip(*blocks)]
+    blocks.clear()
+    user_codes, film_codes, sums, counts = aggregate_ratings(
+        user_rank[columns[0]], film_rank[columns[1]], columns[2], columns[3]
+    )
+    del columns
+
+    df = pd.DataFrame({
+        'Użytkownik': pd.Categorical.from_codes(user_codes, users[user_order]),
+        'Film': pd.Categorical.from_codes(film_codes, films[film_order]),
+        'Ocena': sums / counts,
+    })
+
+    print("=== DataFrame po strumieniowym załadowaniu danych ===")
+    print(df.head())
+    print(f"Liczba rekordów: {total}, po grupowaniu: {len(df)}\n")
+
+    return df
+
+
+def cache_path(filepath, cache_dir=CACHE_DIR):
+    """
+    :param filepath: Ścieżka do pliku JSON.
+    :param cache_dir: Katalog pamięci podręcznej.
+    :return: Katalog z kolumnami ocen dla danego pliku źródłowego.
+    """
+    source = os.path.abspath(filepath)
+    digest = hashlib.sha1(source.encode('utf-8')).hexdigest()[:16]
+    name = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(cache_dir, f"{name}-{digest}")
+
+
+def source_key(filepath):
+    """
+    :return: Ścieżka, rozmiar i czas modyfikacji pliku źródłowego (klucz ważności cache).
+    """
+    stat = os.stat(filepath)
+    return {
+        'version': CACHE_VERSION,
+        'source': os.path.abspath(filepath),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+    }
+
+
+def write_ratings_cache(df, path, key):
+    """
+    Zapisuje oceny kolumnowo jako pliki .npy (kody użytkowników i filmów, oceny oraz
+    słowniki nazw), najpierw do katalogu tymczasowego, który potem podmienia stary.
+
+    :param df: DataFrame z load_data_streaming (kolumny kategoryczne).
+    :param path: Katalog cache.
+    :param key: Klucz ważności z source_key.
+    """
+    tmp = f"{path}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    users, films = df['Użytkownik'].cat, df['Film'].cat
+    np.save(os.path.join(tmp, 'user_codes.npy'), users.codes.to_numpy(np.int32))
+    np.save(os.path.join(tmp, 'film_codes.npy'), films.codes.to_numpy(np.int32))
+    np.save(os.path.join(tmp, 'ratings.npy'), df['Ocena'].to_numpy(np.float64))
+    np.save(os.path.join(tmp, 'users.npy'), users.categories.to_numpy(str))
+    np.save(os.path.join(tmp, 'films.npy'), films.categories.to_numpy(str))
+    with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as file:
+        json.dump(key, file)
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp, path)
+
+
+def read_ratings_cache(path, key):
+    """
+    Mapuje kolumny ocen z cache do pamięci (np.load z mmap_mode='r'), bez wczytywania ich.
+
+    :param path: Katalog cache.
+    :param key: Oczekiwany klucz ważności z source_key.
+    :return: Słownik nazwa kolumny -> tablica mapowana z pliku albo None, gdy cache jest
+        nieaktualny.
+    """
+    try:
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as file:
+            if json.load(file) != key:
+                return None
+        return {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r')
+            for name in ('user_codes', 'film_codes', 'ratings', 'users', 'films')
+        }
+    except (OSError, ValueError):
+        return None
+
+
+def ratings_frame(columns):
+    """
+    :param columns: Kolumny z read_ratings_cache.
+    :return: DataFrame jak z load_data_streaming (kolumny są kopiowane do pamięci).
+    """
+    return pd.DataFrame({
+        'Użytkownik': pd.Categorical.from_codes(columns['user_codes'], columns['users']),
+        'Film': pd.Categorical.from_codes(columns['film_codes'], columns['films']),
+        'Ocena': columns['ratings'],
+    })
+
+
+def ratings_matrix(columns):
+    """
+    Buduje SparseUserItemMatrix wprost z kolumn cache. Oceny są posortowane po
+    (użytkownik, film) i bez duplikatów, więc mapowane tablice ocen i kodów filmów stają się
+    bez kopiowania buforami data i indices macierzy CSR; liczony jest tylko indptr.
+
+    :param columns: Kolumny z read_ratings_cache.
+    :return: SparseUserItemMatrix jak z create_sparse_user_item_matrix.
+    """
+    counts = np.bincount(columns['user_codes'], minlength=len(columns['users']))
+    # użytkownicy bez ocen nie mają wiersza, jak w create_sparse_user_item_matrix
+    rated = counts > 0
+    indptr = np.concatenate([[0], np.cumsum(counts[rated])]).astype(np.int64)
+    values = sparse.csr_matrix(
+        (columns['ratings'], columns['film_codes'], indptr),
+        shape=(int(rated.sum()), len(columns['films'])),
+        copy=False,
+    )
+    return SparseUserItemMatrix(values, columns['users'][rated], columns['films'])
+
+
+def refresh_ratings_cache(filepath, cache_dir=CACHE_DIR):
+    """
+    Zwraca kolumny z cache, a gdy cache jest nieaktualny, parsuje JSON przez
+    load_data_streaming i zapisuje go od nowa.
+
+    :return: Kolumny z read_ratings_cache, katalog cache i informacja, czy cache był aktualny.
+    """
+    key = source_key(filepath)
+    path = cache_path(filepath, cache_dir)
+    columns = read_ratings_cache(path, key)
+    if columns is not None:
+        return columns, path, True
+    write_ratings_cache(load_data_streaming(filepath), path, key)
+    return read_ratings_cache(path, key), path, False
+
+
+def load_data_cached(filepath, cache_dir=CACHE_DIR):
+    """
+    Ładuje oceny z binarnej pamięci podręcznej, jeśli plik źródłowy się nie zmienił
+    (ta sama ścieżka, rozmiar i czas modyfikacji). W przeciwnym razie parsuje JSON przez
+    load_data_streaming i zapisuje wynik do cache.
+
+    :param filepath: Ścieżka do pliku JSON.
+    :param cache_dir: Katalog pamięci podręcznej.
+    :return: Pandas DataFrame ze średnimi ocenami (jak z load_data_streaming).
+    """
+    columns, path, cached = refresh_ratings_cache(filepath, cache_dir)
+    df = ratings_frame(columns)
+    if cached:
+        print("=== DataFrame wczytany z cache ===")
+        print(f"Liczba rekordów: {len(df)} ({path})\n")
+    return df
+
+
+def load_matrix_cached(filepath, cache_dir=CACHE_DIR):
+    """
+    Ładuje rzadką macierz użytkownik-film z cache bez budowania DataFrame: bufory CSR
+    wskazują na kolumny mapowane z plików .npy (zob. ratings_matrix), więc oceny nie są
+    kopiowane do pamięci procesu. Nieaktualny cache jest najpierw odświeżany.
+
+    :param filepath: Ścieżka do pliku JSON.
+    :param cache_dir: Katalog pamięci podręcznej.
+    :return: SparseUserItemMatrix (jak create_sparse_user_item_matrix(load_data_cached(...))).
+    """
+    columns, path, _ = refresh_ratings_cache(filepath, cache_dir)
+    matrix = ratings_matrix(columns)
+
+    print("=== Rzadka macierz użytkownik-film (cache) ===")
+    print(f"Rozmiar macierzy: {matrix.shape}, liczba ocen: {matrix.values.nnz} ({path})\n")
+    return matrix
+
+
 def create_user_item_matrix(df):
     """
     Tworzy macierz użytkownik-film z ocenami.
@@ -50,3 +428,117 @@ def create_user_item_matrix(df):
     print(matrix.head())
     print(f"Rozmiar macierzy: {matrix.shape}\n")
     return matrix
+
+
+class SparseUserItemMatrix:
+    """
+    Rzadka macierz użytkownik-film w formacie CSR z użytkownikami i filmami zakodowanymi
+    liczbami całkowitymi. Wiersz i kolumna to kody, a tablice `users` i `films` pozwalają
+    wrócić do nazw. Brak oceny to brak wpisu (odpowiednik zera w gęstej macierzy), więc
+    pamięć rośnie z liczbą ocen, a nie z iloczynem użytkowników i filmów.
+
+    Atrybuty `index`, `columns`, `shape` i `empty` działają jak w DataFrame z
+    `create_user_item_matrix`, dzięki czemu obie reprezentacje można przekazywać do
+    klasteryzacji, ewaluacji i rekomendacji.
+    """
+
+    def __init__(self, values, users, films):
+        """
+        :param values: Macierz ocen (scipy.sparse) o wymiarach użytkownicy x filmy.
+        :param users: Nazwy użytkowników w kolejności wierszy.
+        :param films: Tytuły filmów w kolejności kolumn.
+        """
+        self.values = sparse.csr_matrix(values, dtype=np.float64)
+        self.users = np.asarray(users, dtype=object)
+        self.films = np.asarray(films, dtype=object)
+        self.user_codes = {user: code for code, user in enumerate(self.users)}
+        self.film_codes = {film: code for code, film in enumerate(self.films)}
+
+    @property
+    def index(self):
+        return pd.Index(self.users, name='Użytkownik')
+
+    @property
+    def columns(self):
+        return pd.Index(self.films, name='Film')
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def empty(self):
+        return self.values.shape[0] == 0 or self.values.shape[1] == 0
+
+    def user_code(self, user):
+        """
+        :param user: Nazwa użytkownika.
+        :return: Numer wiersza użytkownika.
+        """
+        return self.user_codes[user]
+
+    def to_dense(self):
+        """
+        :return: Gęsta macierz użytkownik-film jako DataFrame (jak z create_user_item_matrix).
+        """
+        return pd.DataFrame(self.values.toarray(), index=self.index, columns=self.columns)
+
+
+def create_sparse_user_item_matrix(df):
+    """
+    Tworzy rzadką macierz użytkownik-film z ocenami, z kodami liczbowymi zamiast nazw.
+    Kolejność użytkowników i filmów jest taka sama jak w create_user_item_matrix.
+
+    :param df: DataFrame z danymi (po grupowaniu duplikatów).
+    :return: SparseUserItemMatrix.
+    """
+    user_codes, users = pd.factorize(df['Użytkownik'], sort=True)
+    film_codes, films = pd.factorize(df['Film'], sort=True)
+    values = sparse.csr_matrix(
+        (df['Ocena'].to_numpy(dtype=np.float64), (user_codes, film_codes)),
+        shape=(len(users), len(films)),
+    )
+    matrix = SparseUserItemMatrix(values, users, films)
+
+    print("=== Rzadka macierz użytkownik-film ===")
+    print(f"Rozmiar macierzy: {matrix.shape}, liczba ocen: {matrix.values.nnz}\n")
+    return matrix
+
+
+def is_sparse(matrix):
+    """
+    :param matrix: Macierz użytkownik-film (DataFrame lub SparseUserItemMatrix).
+    :return: True dla reprezentacji rzadkiej.
+    """
+    return isinstance(matrix, SparseUserItemMatrix)
+
+
+def matrix_values(matrix):
+    """
+    Zwraca dane macierzy w postaci przyjmowanej przez scikit-learn.
+
+    :param matrix: Macierz użytkownik-film (DataFrame lub SparseUserItemMatrix).
+    :return: Macierz CSR dla reprezentacji rzadkiej, w przeciwnym razie DataFrame.
+    """
+    return matrix.values if is_sparse(matrix) else matrix
+
+
+def cluster_centroids(values, labels):
+    """
+    Liczy centroidy klastrów jednym mnożeniem przez macierz przynależności.
+
+    :param values: Dane (numpy lub scipy.sparse), wiersze to użytkownicy.
+    :param labels: Etykiety klastrów.
+    :return: Etykiety klastrów, centroidy (numpy) oraz liczności klastrów.
+    """
+    clusters, codes = np.unique(labels, return_inverse=True)
+    membership = sparse.csr_matrix(
+        (np.ones(len(codes)), (codes, np.arange(len(codes)))),
+        shape=(len(clusters), len(codes)),
+    )
+    counts = np.bincount(codes)
+    sums = membership @ values
+    if sparse.issparse(sums):
+        sums = sums.toarray()
+    centroids = np.asarray(sums) / counts[:, None]
+    return clusters, centroids, counts
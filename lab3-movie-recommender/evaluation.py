@@ -1,30 +1,225 @@
-from sklearn.metrics import silhouette_score, davies_bouldin_score
+from sklearn.cluster import AgglomerativeClustering
+from scipy.stats import norm
+from sklearn.metrics import adjusted_rand_score, pairwise_distances_chunked
+from sklearn.preprocessing import StandardScaler
+import numpy as np
 import pandas as pd
+from scipy import sparse
 
-def evaluate_clustering(matrix, labels):
+from clustering import ScalableAgglomerative
+from data_loader import matrix_values, cluster_centroids
+
+
+def row_squared_norms(values):
+    """
+    :return: Kwadraty norm euklidesowych wierszy (numpy lub scipy.sparse).
     """
-    Ocena jakości klasteryzacji za pomocą Silhouette Score i Davies-Bouldin Index.
+    if sparse.issparse(values):
+        return np.asarray(values.multiply(values).sum(axis=1)).ravel()
+    return np.einsum('ij,ij->i', values, values)
 
-    :param matrix: Macierz użytkownik-film.
+
+def davies_bouldin_from_centroids(values, labels, squared_norms=None):
+    """
+    Davies-Bouldin Index bez zamiany danych na gęste: średnia odległość od centroidu
+    wynika z ||x - c||^2 = ||x||^2 - 2 x·c + ||c||^2.
+
+    :param values: Dane (numpy lub scipy.sparse).
+    :param labels: Etykiety klastrów.
+    :param squared_norms: Kwadraty norm wierszy, jeśli policzone wcześniej (wspólne dla wielu etykiet).
+    :return: Davies-Bouldin Index.
+    """
+    clusters, centroids, counts = cluster_centroids(values, labels)
+    codes = np.searchsorted(clusters, labels)
+    if squared_norms is None:
+        squared_norms = row_squared_norms(values)
+    dots = np.asarray(values @ centroids.T)[np.arange(len(codes)), codes]
+    distances = np.sqrt(np.maximum(
+        squared_norms - 2 * dots + np.einsum('ij,ij->i', centroids, centroids)[codes], 0))
+    intra = np.bincount(codes, weights=distances) / counts
+
+    separation = np.sqrt(np.maximum(
+        np.sum((centroids[:, None, :] - centroids[None, :, :]) ** 2, axis=2), 0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = (intra[:, None] + intra[None, :]) / separation
+    # pokrywające się centroidy (w tym przekątna) nie wnoszą nic, jak w scikit-learn
+    ratios[~np.isfinite(ratios)] = 0
+    return float(np.mean(np.max(ratios, axis=1)))
+
+
+def evaluate_clustering(matrix, labels, sample_size=2000):
+    """
+    Ocena jakości jednej klasteryzacji za pomocą Silhouette Score i Davies-Bouldin Index.
+    Liczona jak w evaluate_clusterings, więc Silhouette Score pochodzi z próbki.
+
+    :param matrix: Macierz użytkownik-film (DataFrame lub SparseUserItemMatrix).
     :param labels: Etykiety klastrów.
+    :param sample_size: Przybliżona liczność próbki do Silhouette Score.
     :return: Silhouette Score i Davies-Bouldin Index.
     """
-    if len(set(labels)) > 1:
-        silhouette = silhouette_score(matrix, labels)
-        davies_bouldin = davies_bouldin_score(matrix, labels)
-    else:
-        silhouette = -1
-        davies_bouldin = -1
+    (_, silhouette, davies_bouldin, _, _), = evaluate_clusterings(matrix, {'labels': labels}, sample_size)
     return silhouette, davies_bouldin
 
 
+def stratified_sample(strata, sample_size, rng, min_per_stratum=2):
+    """
+    Losuje wiersze z każdej warstwy proporcjonalnie do jej liczności (co najmniej
+    min_per_stratum, nie więcej niż liczność warstwy).
+
+    :param strata: Numer warstwy każdego wiersza.
+    :return: Posortowane numery wylosowanych wierszy.
+    """
+    sizes = np.bincount(strata)
+    quota = np.minimum(sizes, np.maximum(min_per_stratum, np.round(sample_size * sizes / len(strata)).astype(int)))
+    order = np.argsort(strata, kind='stable')
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    picked = [rng.choice(order[start:start + size], size=count, replace=False)
+              for start, size, count in zip(starts, sizes, quota) if count]
+    return np.sort(np.concatenate(picked))
+
+
+def sampled_silhouettes(values, label_sets, sample_size=2000, working_memory=256, confidence=0.95, random_state=42):
+    """
+    Silhouette Score dla kilku zestawów etykiet z jednej próbki i jednego liczenia odległości.
+
+    Próbka jest warstwowa: warstwą jest kombinacja klastrów ze wszystkich zestawów etykiet, więc
+    każdy klaster każdego algorytmu jest reprezentowany. Dla wylosowanych użytkowników
+    odległości do wszystkich użytkowników są liczone porcjami (pairwise_distances_chunked,
+    najwyżej working_memory MB naraz), a każda porcja służy wszystkim zestawom etykiet: sumy
+    odległości do klastrów to iloczyn porcji z macierzą przynależności. Wartość silhouette
+    każdego wylosowanego użytkownika jest dokładna; szacowana jest tylko średnia (estymator
+    warstwowy z przedziałem ufności). Gdy próbka obejmuje wszystkich, wynik jest dokładny.
+
+    :param values: Dane (numpy lub scipy.sparse), wiersze to użytkownicy.
+    :param label_sets: Słownik nazwa -> etykiety klastrów.
+    :param sample_size: Przybliżona liczność próbki.
+    :param working_memory: Limit pamięci na porcję odległości w MB.
+    :param confidence: Poziom ufności przedziału.
+    :param random_state: Ziarno losowania.
+    :return: Słownik nazwa -> (silhouette, dolna granica, górna granica).
+    """
+    names = list(label_sets)
+    codes = np.column_stack([np.unique(label_sets[name], return_inverse=True)[1] for name in names])
+    _, strata = np.unique(codes, axis=0, return_inverse=True)
+    strata = strata.ravel()
+    n_users = len(strata)
+    sample = np.arange(n_users) if n_users <= sample_size else \
+        stratified_sample(strata, sample_size, np.random.default_rng(random_state))
+
+    memberships = [sparse.csr_matrix((np.ones(n_users), (np.arange(n_users), codes[:, j])))
+                   for j in range(len(names))]
+    counts = [np.bincount(codes[:, j]) for j in range(len(names))]
+    scores = np.zeros((len(names), len(sample)))
+    start = 0
+    for chunk in pairwise_distances_chunked(values[sample], values, working_memory=working_memory):
+        rows = slice(start, start + len(chunk))
+        for j, (membership, count) in enumerate(zip(memberships, counts)):
+            own = codes[sample[rows], j]
+            means = np.asarray((membership.T @ chunk.T).T)
+            intra = means[np.arange(len(chunk)), own] / np.maximum(count[own] - 1, 1)
+            means = means / count
+            means[np.arange(len(chunk)), own] = np.inf
+            inter = means.min(axis=1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                score = (inter - intra) / np.maximum(intra, inter)
+            # jak w scikit-learn: 0 dla klastrów jednoelementowych i przy zerowych odległościach
+            score[(count[own] == 1) | ~np.isfinite(score)] = 0
+            scores[j, rows] = score
+        start += len(chunk)
+
+    sample_strata = strata[sample]
+    sizes = np.bincount(strata)
+    weights = sizes / n_users
+    taken = np.bincount(sample_strata, minlength=len(sizes))
+    z = norm.ppf(0.5 + confidence / 2)
+    results = {}
+    for j, name in enumerate(names):
+        sums = np.bincount(sample_strata, weights=scores[j], minlength=len(sizes))
+        squares = np.bincount(sample_strata, weights=scores[j] ** 2, minlength=len(sizes))
+        means = sums / np.maximum(taken, 1)
+        variances = (squares - taken * means ** 2) / np.maximum(taken - 1, 1)
+        estimate = float(np.sum(weights * means))
+        # poprawka na skończoną populację: warstwa pobrana w całości nie wnosi niepewności
+        error = float(np.sqrt(np.sum(weights ** 2 * (1 - taken / sizes) * np.maximum(variances, 0)
+                                     / np.maximum(taken, 1))))
+        results[name] = (estimate, float(estimate - z * error), float(estimate + z * error))
+    return results
+
+
+def evaluate_clusterings(matrix, label_sets, sample_size=2000, working_memory=256, confidence=0.95):
+    """
+    Ocena kilku klasteryzacji naraz: Silhouette Score z próbki warstwowej (z przedziałem
+    ufności) i Davies-Bouldin Index z centroidów klastrów.
+
+    :param matrix: Macierz użytkownik-film (DataFrame lub SparseUserItemMatrix).
+    :param label_sets: Słownik nazwa -> etykiety klastrów.
+    :param sample_size: Przybliżona liczność próbki do Silhouette Score.
+    :param working_memory: Limit pamięci na porcję odległości w MB.
+    :param confidence: Poziom ufności przedziału.
+    :return: Lista krotek (nazwa, silhouette, Davies-Bouldin, dolna i górna granica przedziału)
+        dla compare_algorithms; -1 gdy jest tylko jeden klaster.
+    """
+    values = matrix_values(matrix)
+    values = values if sparse.issparse(values) else np.asarray(values, dtype=np.float64)
+    valid = {name: labels for name, labels in label_sets.items() if len(np.unique(labels)) > 1}
+    silhouettes = sampled_silhouettes(values, valid, sample_size, working_memory, confidence) if valid else {}
+    squared_norms = row_squared_norms(values)
+
+    results = []
+    for name, labels in label_sets.items():
+        if name in silhouettes:
+            silhouette, low, high = silhouettes[name]
+            results.append((name, silhouette, davies_bouldin_from_centroids(values, np.asarray(labels), squared_norms),
+                            low, high))
+        else:
+            results.append((name, -1, -1, -1, -1))
+    return results
+
+
 def compare_algorithms(matrix, clustering_results):
     """
     Porównuje różne algorytmy klasteryzacji na podstawie metryk Silhouette Score i Davies-Bouldin Index.
 
     :param matrix: Macierz użytkownik-film.
-    :param clustering_results: Lista krotek zawierających nazwę algorytmu, Silhouette Score i Davies-Bouldin Index.
+    :param clustering_results: Lista krotek zawierających nazwę algorytmu, Silhouette Score i Davies-Bouldin Index
+        (opcjonalnie także granice przedziału ufności Silhouette Score, jak z evaluate_clusterings).
     """
-    comparison_df = pd.DataFrame(clustering_results, columns=['Algorithm', 'Silhouette Score', 'Davies-Bouldin Index'])
+    columns = ['Algorithm', 'Silhouette Score', 'Davies-Bouldin Index', 'Silhouette CI Low', 'Silhouette CI High']
+    comparison_df = pd.DataFrame(clustering_results, columns=columns[:len(clustering_results[0])])
     print("\n=== Porównanie Algorytmów Klasteryzacji ===")
-    print(comparison_df)
+    print(comparison_df.to_string())
+
+
+def agglomerative_agreement(matrix, n_clusters=3, sample_sizes=(2000, 4000), repeats=3, random_state=42):
+    """
+    Porównuje etykiety ScalableAgglomerative z dokładnym AgglomerativeClustering
+    (metric='cosine', linkage='average') na losowych próbkach użytkowników, na tyle małych,
+    że dokładny algorytm mieści się w pamięci. Zgodność to Adjusted Rand Index (1 oznacza
+    ten sam podział, niezależnie od numeracji klastrów).
+
+    :param matrix: Macierz użytkownik-film (DataFrame lub SparseUserItemMatrix).
+    :param n_clusters: Liczba klastrów.
+    :param sample_sizes: Liczności próbek (ograniczane do liczby użytkowników).
+    :param repeats: Liczba losowych próbek każdej liczności.
+    :param random_state: Ziarno losowania próbek.
+    :return: DataFrame z licznością próbki, liczbą mikroklastrów i ARI.
+    """
+    values = matrix_values(matrix)
+    values = values if sparse.issparse(values) else np.asarray(values, dtype=np.float64)
+    n_users = values.shape[0]
+    rng = np.random.default_rng(random_state)
+    rows = []
+    for size in sorted({min(size, n_users) for size in sample_sizes}):
+        for _ in range(repeats if size < n_users else 1):
+            sample = np.sort(rng.choice(n_users, size=size, replace=False))
+            dense = values[sample].toarray() if sparse.issparse(values) else values[sample]
+            exact = AgglomerativeClustering(n_clusters=n_clusters, metric='cosine', linkage='average')
+            exact_labels = exact.fit_predict(StandardScaler().fit_transform(dense))
+            scalable = ScalableAgglomerative(n_clusters=n_clusters)
+            scalable_labels = scalable.fit_predict(values[sample])
+            rows.append((size, scalable.n_micro_, adjusted_rand_score(exact_labels, scalable_labels)))
+
+    agreement = pd.DataFrame(rows, columns=['Użytkownicy', 'Mikroklastry', 'ARI'])
+    print("\n=== Zgodność Agglomerative (tryb skalowalny vs dokładny) ===")
+    print(agreement.groupby(['Użytkownicy', 'Mikroklastry'])['ARI'].agg(['mean', 'min', 'max']))
+    return agreement
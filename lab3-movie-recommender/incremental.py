@@ -0,0 +1,251 @@
+import numpy as np
+from scipy import sparse
+from sklearn.cluster import KMeans
+
+from data_loader import SparseUserItemMatrix
+
+# progi dryfu, po których przekroczeniu model jest dopasowywany od nowa
+DRIFT_THRESHOLDS = {
+    'changed': 0.25,
+    'centroid_shift': 0.2,
+    'scale_shift': 0.1,
+}
+
+
+class IncrementalKMeans:
+    """
+    K-Means aktualizowany przyrostowo, gdy napływają nowe oceny.
+
+    Pierwsze dopasowanie jest takie samo jak w perform_kmeans_clustering i
+    fit_all_clusterings (standaryzacja bez odejmowania średniej, KMeans z random_state=42). Model trzyma sumy i sumy
+    kwadratów kolumn (statystyki StandardScaler) oraz sumy ocen i liczności klastrów w
+    skali surowych ocen, więc centroid w skali standaryzowanej to średnia klastra
+    podzielona przez odchylenie standardowe kolumny.
+
+    Aktualizacja (update) podmienia wiersze nowych lub zmienionych użytkowników, poprawia
+    statystyki kolumn o różnicę starych i nowych wierszy, a następnie przypisuje tylko te
+    wiersze do najbliższych centroidów (mini-batch: kilka przebiegów przypisanie ->
+    przeliczenie średnich). Przeliczane są wyłącznie średnie klastrów, do których
+    zmienieni użytkownicy należeli lub trafili. Pełne dopasowanie, startujące z obecnych
+    centroidów, następuje dopiero gdy metryki dryfu przekroczą progi.
+    """
+
+    def __init__(self, matrix, n_clusters=3, thresholds=None, max_iter=10):
+        """
+        :param matrix: SparseUserItemMatrix z początkowymi ocenami.
+        :param n_clusters: Liczba klastrów.
+        :param thresholds: Progi dryfu (domyślnie DRIFT_THRESHOLDS).
+        :param max_iter: Największa liczba przebiegów mini-batch na aktualizację.
+        """
+        self.n_clusters = n_clusters
+        self.thresholds = dict(DRIFT_THRESHOLDS, **(thresholds or {}))
+        self.max_iter = max_iter
+        self.users = list(matrix.users)
+        self.films = list(matrix.films)
+        self.user_codes = dict(matrix.user_codes)
+        self.film_codes = dict(matrix.film_codes)
+        self.values = matrix.values.copy()
+        self.column_sums = np.asarray(self.values.sum(axis=0)).ravel()
+        self.column_squares = np.asarray(self.values.multiply(self.values).sum(axis=0)).ravel()
+        self.refits = 0
+        self.fit()
+
+    @property
+    def matrix(self):
+        """
+        :return: Aktualna macierz ocen jako SparseUserItemMatrix.
+        """
+        return SparseUserItemMatrix(self.values, self.users, self.films)
+
+    @property
+    def cluster_means(self):
+        """
+        :return: Średnie oceny filmów w klastrach (klastry x filmy), jak w RecommendationIndex.
+        """
+        return self.sums / np.maximum(self.counts, 1)[:, None]
+
+    def scale(self):
+        """
+        :return: Odchylenie standardowe kolumn (1 dla kolumn stałych), jak w StandardScaler.
+        """
+        n = len(self.users)
+        mean = self.column_sums / n
+        variance = self.column_squares / n - mean ** 2
+        # różnica dużych liczb: wariancję na poziomie błędu zaokrąglenia traktujemy jak zero
+        variance[variance <= 1e-12 * np.maximum(self.column_squares / n, 1)] = 0
+        std = np.sqrt(variance)
+        std[std == 0] = 1.0
+        return std
+
+    def centers(self, scale=None):
+        """
+        :return: Centroidy w skali standaryzowanej.
+        """
+        return self.cluster_means / (self.scale() if scale is None else scale)
+
+    def assign(self, rows, centers, scale):
+        """
+        Przypisuje wiersze do najbliższych centroidów.
+
+        :param rows: Surowe wiersze (scipy.sparse).
+        :return: Etykiety i kwadraty odległości do przypisanych centroidów.
+        """
+        scaled = sparse.csr_matrix(rows.multiply(1 / scale))
+        norms = np.asarray(scaled.multiply(scaled).sum(axis=1)).ravel()
+        distances = norms[:, None] - 2 * np.asarray(scaled @ centers.T) + np.einsum('ij,ij->i', centers, centers)
+        labels = np.argmin(distances, axis=1)
+        return labels, np.maximum(distances[np.arange(len(labels)), labels], 0)
+
+    def cluster_sums(self, labels, rows):
+        """
+        :return: Sumy wierszy w każdym klastrze (klastry x filmy), jednym mnożeniem macierzy.
+        """
+        membership = sparse.csr_matrix(
+            (np.ones(len(labels)), (labels, np.arange(len(labels)))),
+            shape=(self.n_clusters, len(labels)),
+        )
+        return np.asarray((membership @ rows).toarray())
+
+    def fit(self, init='k-means++'):
+        """
+        Pełne dopasowanie na wszystkich użytkownikach.
+
+        :param init: Początkowe centroidy ('k-means++' albo tablica centroidów do ciepłego startu).
+        """
+        scale = self.scale()
+        if isinstance(init, str):
+            kmeans = KMeans(n_clusters=self.n_clusters, random_state=42)
+        else:
+            kmeans = KMeans(n_clusters=self.n_clusters, init=init, n_init=1, random_state=42)
+        kmeans.fit(sparse.csr_matrix(self.values.multiply(1 / scale)))
+        self.model = kmeans
+        self.labels = kmeans.labels_.copy()
+        self.counts = np.bincount(self.labels, minlength=self.n_clusters)
+        self.sums = self.cluster_sums(self.labels, self.values)
+
+        # punkt odniesienia dla metryk dryfu
+        self.fit_users = len(self.users)
+        self.fit_scale = scale
+        self.fit_centers = self.centers(scale)
+        separation = np.sqrt(np.sum((self.fit_centers[:, None] - self.fit_centers[None]) ** 2, axis=2))
+        self.fit_separation = separation[~np.eye(self.n_clusters, dtype=bool)].min() if self.n_clusters > 1 else 1.0
+        self.changed = set()
+
+    def update_rows(self, ratings):
+        """
+        Wstawia lub podmienia wiersze użytkowników i poprawia statystyki kolumn.
+
+        :param ratings: DataFrame z kolumnami Użytkownik, Film, Ocena; dla każdego użytkownika
+            z aktualizacji zawiera wszystkie jego oceny (zastępują poprzednie).
+        :return: Kody zmienionych użytkowników, ich poprzednie wiersze i nowe wiersze.
+        """
+        ratings = ratings.groupby(['Użytkownik', 'Film'], as_index=False, sort=False)['Ocena'].mean()
+        for film in ratings['Film'].unique():
+            if film not in self.film_codes:
+                self.film_codes[film] = len(self.films)
+                self.films.append(film)
+        new_users = [user for user in ratings['Użytkownik'].unique() if user not in self.user_codes]
+        for user in new_users:
+            self.user_codes[user] = len(self.users)
+            self.users.append(user)
+
+        n_users, n_films = len(self.users), len(self.films)
+        grow = n_films - len(self.column_sums)
+        if grow:
+            self.column_sums = np.concatenate([self.column_sums, np.zeros(grow)])
+            self.column_squares = np.concatenate([self.column_squares, np.zeros(grow)])
+            self.sums = np.hstack([self.sums, np.zeros((self.n_clusters, grow))])
+        self.values.resize((n_users, n_films))
+        self.labels = np.concatenate([self.labels, np.full(len(new_users), -1)])
+
+        user_codes = np.array([self.user_codes[user] for user in ratings['Użytkownik']], dtype=np.intp)
+        film_codes = np.array([self.film_codes[film] for film in ratings['Film']], dtype=np.intp)
+        codes, rows_of = np.unique(user_codes, return_inverse=True)
+        rows = sparse.csr_matrix(
+            (ratings['Ocena'].to_numpy(dtype=np.float64), (rows_of, film_codes)),
+            shape=(len(codes), n_films),
+        )
+        old_rows = self.values[codes]
+
+        self.column_sums += np.asarray(rows.sum(axis=0) - old_rows.sum(axis=0)).ravel()
+        self.column_squares += np.asarray(
+            rows.multiply(rows).sum(axis=0) - old_rows.multiply(old_rows).sum(axis=0)).ravel()
+
+        # podmiana wierszy: stare wiersze są zerowane, nowe dodawane na ich miejsce
+        keep = np.ones(n_users)
+        keep[codes] = 0
+        placed = sparse.csr_matrix(
+            (np.ones(len(codes)), (codes, np.arange(len(codes)))), shape=(n_users, len(codes)))
+        self.values = sparse.csr_matrix(sparse.diags(keep) @ self.values + placed @ rows)
+        self.values.eliminate_zeros()
+        return codes, old_rows, rows
+
+    def update(self, ratings):
+        """
+        Wprowadza nowe oceny do modelu bez pełnego dopasowania.
+
+        :param ratings: DataFrame z kolumnami Użytkownik, Film, Ocena (pełne oceny nowych lub
+            zmienionych użytkowników).
+        :return: Słownik z podsumowaniem: liczba nowych i zmienionych użytkowników, klastry
+            z przeliczonymi średnimi, metryki dryfu i informacja, czy nastąpiło pełne dopasowanie.
+        """
+        if ratings.empty:
+            return {'new_users': 0, 'changed_users': 0, 'affected_clusters': [], 'drift': self.drift(),
+                    'refit': False}
+
+        n_before = len(self.users)
+        codes, old_rows, rows = self.update_rows(ratings)
+        old_labels = self.labels[codes]
+
+        # usunięcie starych wierszy z sum klastrów
+        known = old_labels >= 0
+        self.sums -= self.cluster_sums(old_labels[known], old_rows[known])
+        self.counts -= np.bincount(old_labels[known], minlength=self.n_clusters)
+
+        scale = self.scale()
+        labels = np.full(len(codes), -1)
+        for _ in range(self.max_iter):
+            new_labels, _ = self.assign(rows, self.centers(scale), scale)
+            if np.array_equal(new_labels, labels):
+                break
+            assigned = labels >= 0
+            self.sums -= self.cluster_sums(labels[assigned], rows[assigned])
+            self.counts -= np.bincount(labels[assigned], minlength=self.n_clusters)
+            self.sums += self.cluster_sums(new_labels, rows)
+            self.counts += np.bincount(new_labels, minlength=self.n_clusters)
+            labels = new_labels
+        self.labels[codes] = labels
+        self.changed.update(codes.tolist())
+
+        affected = np.union1d(old_labels[known], labels)
+        drift = self.drift(scale)
+        refit = bool(any(drift[name] > self.thresholds[name] for name in self.thresholds) or (self.counts == 0).any())
+        if refit:
+            self.fit(init=self.centers(scale))
+            self.refits += 1
+        return {
+            'new_users': len(self.users) - n_before,
+            'changed_users': len(codes) - (len(self.users) - n_before),
+            'affected_clusters': affected.tolist(),
+            'drift': drift,
+            'refit': refit,
+        }
+
+    def drift(self, scale=None):
+        """
+        Metryki dryfu względem ostatniego pełnego dopasowania:
+        - changed: odsetek użytkowników nowych lub zmienionych,
+        - centroid_shift: największe przesunięcie centroidu względem najmniejszej odległości
+          między centroidami,
+        - scale_shift: średnia względna zmiana odchylenia standardowego kolumn.
+
+        :return: Słownik metryk.
+        """
+        scale = self.scale() if scale is None else scale
+        shift = np.sqrt(np.sum((self.centers(scale)[:, :self.fit_centers.shape[1]] - self.fit_centers) ** 2, axis=1))
+        fit_scale = np.concatenate([self.fit_scale, np.ones(len(scale) - len(self.fit_scale))])
+        return {
+            'changed': len(self.changed) / max(self.fit_users, 1),
+            'centroid_shift': float(shift.max() / self.fit_separation) if self.fit_separation else float('inf'),
+            'scale_shift': float(np.mean(np.abs(scale / fit_scale - 1))),
+        }
@@ -1,42 +1,61 @@
+import argparse
 import sys
-from data_loader import load_data, create_user_item_matrix
-from clustering import perform_kmeans_clustering, perform_agglomerative_clustering, perform_gmm_clustering
-from evaluation import evaluate_clustering, compare_algorithms
-from recommendation import recommend_films, anti_recommend_films, display_recommendations, display_anti_recommendations
+
+import pandas as pd
+
+from data_loader import load_matrix_cached
+from orchestrator import fit_all_clusterings
+from evaluation import evaluate_clusterings, compare_algorithms, agglomerative_agreement
+from recommendation import RecommendationIndex, display_recommendations, display_anti_recommendations
 from visualization import visualize_clusters
 
 # Made by s24399-pj
 
+# metryka podawana przy wykresach i rekomendacjach każdego algorytmu
+DISTANCE_METRICS = {'KMeans': 'Euclidean', 'Agglomerative': 'Cosine', 'GMM': 'EM'}
+EVALUATION_NAMES = {'Agglomerative': 'Agglomerative Clustering'}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Rekomendator filmów')
+    parser.add_argument('--eksport', default=None,
+                        help='zapisz rekomendacje wszystkich użytkowników do pliku CSV i zakończ')
+    parser.add_argument('--zgodnosc', action='store_true',
+                        help='porównaj skalowalny tryb Agglomerative z dokładnym na próbkach użytkowników')
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
     filepath = 'dane_filmy.json'
 
-    df = load_data(filepath)
-    matrix = create_user_item_matrix(df)
+    matrix = load_matrix_cached(filepath)
 
     if matrix.empty:
         sys.exit(1)
 
-    kmeans_model, kmeans_labels = perform_kmeans_clustering(matrix, n_clusters=3)
+    results = fit_all_clusterings(matrix, n_clusters=3)
+    labels = {name: result['labels'] for name, result in results.items()}
 
-    agglomerative_model, agglomerative_labels = perform_agglomerative_clustering(matrix, n_clusters=3, distance_metric='cosine')
+    for name, algorithm_labels in labels.items():
+        visualize_clusters(matrix, algorithm_labels, name, DISTANCE_METRICS[name])
 
-    gmm_model, gmm_labels = perform_gmm_clustering(matrix, n_clusters=3, covariance_type='full')
+    clustering_results = evaluate_clusterings(matrix, {
+        EVALUATION_NAMES.get(name, name): algorithm_labels for name, algorithm_labels in labels.items()
+    })
 
-    visualize_clusters(matrix, kmeans_labels, 'KMeans', 'Euclidean')
-    visualize_clusters(matrix, agglomerative_labels, 'Agglomerative', 'Cosine')
-    visualize_clusters(matrix, gmm_labels, 'GMM', 'EM')
+    compare_algorithms(matrix, clustering_results)
 
-    silhouette_kmeans, db_kmeans = evaluate_clustering(matrix, kmeans_labels)
-    silhouette_agglomerative, db_agglomerative = evaluate_clustering(matrix, agglomerative_labels)
-    silhouette_gmm, db_gmm = evaluate_clustering(matrix, gmm_labels)
+    if args.zgodnosc:
+        agglomerative_agreement(matrix, n_clusters=3)
 
-    clustering_results = [
-        ('KMeans', silhouette_kmeans, db_kmeans),
-        ('Agglomerative Clustering', silhouette_agglomerative, db_agglomerative),
-        ('GMM', silhouette_gmm, db_gmm)
-    ]
+    indexes = {name: RecommendationIndex(matrix, algorithm_labels, top_n=5) for name, algorithm_labels in labels.items()}
 
-    compare_algorithms(matrix, clustering_results)
+    if args.eksport:
+        frames = [index.to_frame().assign(Algorytm=name) for name, index in indexes.items()]
+        pd.concat(frames, ignore_index=True).to_csv(args.eksport, index=False, encoding='utf-8')
+        print(f"\nZapisano rekomendacje wszystkich użytkowników do {args.eksport}")
+        return
 
     users = matrix.index.tolist()
     print("\nDostępni użytkownicy:")
@@ -54,24 +73,10 @@ def main():
 
     selected_user = users[choice - 1]
 
-    # KMeans
-    recommendations_kmeans = recommend_films(selected_user, matrix, kmeans_labels, algorithm='kmeans', top_n=5)
-    anti_recommend_kmeans = anti_recommend_films(selected_user, matrix, kmeans_labels, algorithm='kmeans', top_n=5)
-
-    # Agglomerative
-    recommendations_agglomerative = recommend_films(selected_user, matrix, agglomerative_labels, algorithm='agglomerative', top_n=5)
-    anti_recommend_agglomerative = anti_recommend_films(selected_user, matrix, agglomerative_labels, algorithm='agglomerative', top_n=5)
-
-    # GMM
-    recommendations_gmm = recommend_films(selected_user, matrix, gmm_labels, algorithm='GMM', top_n=5)
-    anti_recommend_gmm = anti_recommend_films(selected_user, matrix, gmm_labels, algorithm='GMM', top_n=5)
-
-    display_recommendations(selected_user, recommendations_kmeans, 'Euclidean', 'KMeans')
-    display_anti_recommendations(selected_user, anti_recommend_kmeans, 'Euclidean', 'KMeans')
-    display_recommendations(selected_user, recommendations_agglomerative, 'Cosine', 'Agglomerative')
-    display_anti_recommendations(selected_user, anti_recommend_agglomerative, 'Cosine', 'Agglomerative')
-    display_recommendations(selected_user, recommendations_gmm, 'EM', 'GMM')
-    display_anti_recommendations(selected_user, anti_recommend_gmm, 'EM', 'GMM')
+    for name, index in indexes.items():
+        display_recommendations(selected_user, index.recommend(selected_user), DISTANCE_METRICS[name], name)
+        display_anti_recommendations(selected_user, index.recommend(selected_user, anti=True),
+                                     DISTANCE_METRICS[name], name)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,163 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from threadpoolctl import threadpool_limits
+
+from clustering import GMM_DENSE_LIMIT, fit_scaling, cluster_kmeans, cluster_agglomerative, cluster_gmm
+from data_loader import matrix_values
+
+# nazwa algorytmu -> funkcja dopasowania na ocenach z fit_scaling i jej parametry
+ALGORITHMS = {
+    'KMeans': (cluster_kmeans, {}),
+    'Agglomerative': (cluster_agglomerative, {'distance_metric': 'cosine'}),
+    'GMM': (cluster_gmm, {'covariance_type': 'full'}),
+}
+
+
+def share_array(array):
+    """
+    Kopiuje tablicę do pamięci współdzielonej.
+
+    :param array: Tablica numpy.
+    :return: Blok SharedMemory (do zamknięcia przez wywołującego) i opis (nazwa, kształt, typ)
+        pozwalający dołączyć się do niego w innym procesie.
+    """
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+
+def attach_array(spec):
+    """
+    Dołącza się do tablicy z share_array bez kopiowania; widok jest tylko do odczytu.
+
+    :return: Blok SharedMemory i tablica numpy na jego buforze.
+    """
+    name, shape, dtype = spec
+    # procesy puli dzielą resource_tracker z procesem głównym, więc blok zostanie usunięty
+    # dopiero przez unlink w fit_all_clusterings
+    block = shared_memory.SharedMemory(name=name)
+    array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+    array.flags.writeable = False
+    return block, array
+
+
+def share_matrix(values):
+    """
+    Kopiuje macierz ocen do pamięci współdzielonej. Macierz rzadka jest przekazywana
+    jako bufory CSR (data, indices, indptr), więc nie powstaje jej gęsta kopia.
+
+    :param values: Oceny (numpy, DataFrame lub scipy.sparse).
+    :return: Lista bloków SharedMemory (do zamknięcia przez wywołującego) i opis macierzy.
+    """
+    if sparse.issparse(values):
+        values = sparse.csr_matrix(values)
+        shared = [share_array(array) for array in (values.data, values.indices, values.indptr)]
+        return [block for block, _ in shared], ('csr', values.shape, [spec for _, spec in shared])
+    block, spec = share_array(np.ascontiguousarray(values, dtype=np.float64))
+    return [block], ('dense', values.shape, [spec])
+
+
+def attach_matrix(spec):
+    """
+    Odtwarza macierz z share_matrix bez kopiowania buforów.
+
+    :return: Lista bloków SharedMemory i macierz (numpy albo scipy.sparse.csr_matrix).
+    """
+    kind, shape, specs = spec
+    attached = [attach_array(array_spec) for array_spec in specs]
+    blocks = [block for block, _ in attached]
+    arrays = [array for _, array in attached]
+    if kind == 'csr':
+        return blocks, sparse.csr_matrix(tuple(arrays), shape=shape, copy=False)
+    return blocks, arrays[0]
+
+
+def fit_shared(name, spec, center_spec, n_clusters, threads):
+    """
+    Dopasowuje jeden algorytm do skalowanej macierzy z pamięci współdzielonej (w procesie
+    roboczym). Średnie kolumn też są współdzielone, więc skaler nie jest dopasowywany ponownie.
+
+    :return: Model, etykiety i czas dopasowania w sekundach.
+    """
+    fit, params = ALGORITHMS[name]
+    blocks, values = attach_matrix(spec)
+    center_block, center = attach_array(center_spec)
+    blocks.append(center_block)
+    try:
+        with threadpool_limits(threads):
+            start = time.perf_counter()
+            model, labels = fit(values, center, n_clusters, **params)
+            seconds = time.perf_counter() - start
+        return model, np.array(labels), seconds
+    finally:
+        del values, center
+        for block in blocks:
+            block.close()
+
+
+def fit_all_clusterings(matrix, n_clusters=3, workers=None):
+    """
+    Dopasowuje wszystkie algorytmy z ALGORITHMS równolegle do jednej kopii macierzy ocen.
+
+    Macierz jest skalowana raz, w procesie głównym (fit_scaling: StandardScaler bez
+    odejmowania średniej, więc macierz rzadka zostaje rzadka), a skalowane bufory CSR
+    (data, indices, indptr) i wektor średnich kolumn trafiają do pamięci współdzielonej,
+    z której procesy robocze czytają je bez kopiowania i serializacji. K-Means i tryb
+    skalowalny Agglomerative korzystają z nich wprost; gęsta kopia, wycentrowana
+    współdzielonymi średnimi, powstaje tylko dla GMM i trybu dokładnego Agglomerative.
+    GMM jest pomijany, gdy macierz przekracza GMM_DENSE_LIMIT komórek. Każdy proces dostaje równą część wątków BLAS, żeby procesy nie rywalizowały
+    o rdzenie. Przy workers=1 algorytmy są dopasowywane po kolei w bieżącym procesie.
+
+    :param matrix: Macierz użytkownik-film (DataFrame lub SparseUserItemMatrix).
+    :param n_clusters: Liczba klastrów.
+    :param workers: Liczba procesów (domyślnie tyle, ile algorytmów, nie więcej niż rdzeni).
+    :return: Słownik nazwa -> {'model', 'labels', 'seconds'}.
+    """
+    names = list(ALGORITHMS)
+    if matrix.shape[0] * matrix.shape[1] > GMM_DENSE_LIMIT:
+        names.remove('GMM')
+        print(f"GMM pominięty: macierz {matrix.shape} przekracza {GMM_DENSE_LIMIT} komórek\n")
+
+    cpus = os.cpu_count() or 1
+    workers = workers or min(len(names), cpus)
+    threads = max(1, cpus // workers)
+
+    start = time.perf_counter()
+    scaled, center = fit_scaling(matrix_values(matrix))
+    print("=== Skalowana macierz (wspólna dla wszystkich algorytmów) ===")
+    print(f"Rozmiar macierzy: {matrix.shape}\n")
+
+    results = {}
+    if workers == 1:
+        for name in names:
+            fit, params = ALGORITHMS[name]
+            fit_start = time.perf_counter()
+            model, labels = fit(scaled, center, n_clusters, **params)
+            results[name] = {'model': model, 'labels': labels, 'seconds': time.perf_counter() - fit_start}
+    else:
+        blocks, spec = share_matrix(scaled)
+        center_block, center_spec = share_array(center)
+        blocks.append(center_block)
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {name: pool.submit(fit_shared, name, spec, center_spec, n_clusters, threads)
+                           for name in names}
+                for name, future in futures.items():
+                    model, labels, seconds = future.result()
+                    results[name] = {'model': model, 'labels': labels, 'seconds': seconds}
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+    times = pd.Series({name: result['seconds'] for name, result in results.items()}, name='Czas [s]')
+    print("=== Czasy dopasowania ===")
+    print(times.round(3).to_string())
+    print(f"Łącznie: {time.perf_counter() - start:.3f} s, procesy: {workers}\n")
+    return results
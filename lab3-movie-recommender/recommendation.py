@@ -1,19 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from scipy import sparse
+
+from data_loader import is_sparse, cluster_centroids
+
+
+def cluster_mean_and_watched(user, matrix, labels):
+    """
+    Liczy średnie oceny filmów w klastrze użytkownika oraz oceny samego użytkownika.
+
+    :param user: Nazwa użytkownika.
+    :param matrix: Macierz użytkownik-film (DataFrame lub SparseUserItemMatrix).
+    :param labels: Etykiety klastrów.
+    :return: Średnie oceny w klastrze i oceny użytkownika (Series indeksowane filmami).
+    """
+    if is_sparse(matrix):
+        code = matrix.user_code(user)
+        members = np.asarray(labels) == labels[code]
+        # suma przez liczność, jak w cluster_centroids (mean() mnoży przez odwrotność i gubi remisy)
+        cluster_mean = np.asarray(matrix.values[members].sum(axis=0)).ravel() / members.sum()
+        watched = matrix.values[code].toarray().ravel()
+        return pd.Series(cluster_mean, index=matrix.columns), pd.Series(watched, index=matrix.columns)
+
+    user_cluster = labels[matrix.index.get_loc(user)]
+    cluster_members = matrix.index[labels == user_cluster]
+    return matrix.loc[cluster_members].mean(), matrix.loc[user]
+
+
 def recommend_films(user, matrix, labels, algorithm='kmeans', top_n=5):
     """
     Rekomenduje filmy dla użytkownika na podstawie jego klastra.
 
     :param user: Nazwa użytkownika.
-    :param matrix: Macierz użytkownik-film.
+    :param matrix: Macierz użytkownik-film (DataFrame lub SparseUserItemMatrix).
     :param labels: Etykiety klastrów.
     :param algorithm: Algorytm klasteryzacji użyty do etykiet.
     :param top_n: Liczba rekomendacji.
     :return: Lista rekomendowanych filmów.
     """
-    user_cluster = labels[matrix.index.get_loc(user)]
-    cluster_members = matrix.index[labels == user_cluster]
-    cluster_mean = matrix.loc[cluster_members].mean()
-    watched = matrix.loc[user]
-    recommendations = cluster_mean[watched == 0].sort_values(ascending=False).head(top_n).index.tolist()
+    cluster_mean, watched = cluster_mean_and_watched(user, matrix, labels)
+    recommendations = cluster_mean[watched == 0].sort_values(ascending=False, kind='stable').head(top_n).index.tolist()
     return recommendations
 
 
@@ -22,20 +49,130 @@ def anti_recommend_films(user, matrix, labels, algorithm='kmeans', top_n=5):
     Rekomenduje filmy, których użytkownik nie powinien oglądać.
 
     :param user: Nazwa użytkownika.
-    :param matrix: Macierz użytkownik-film.
+    :param matrix: Macierz użytkownik-film (DataFrame lub SparseUserItemMatrix).
     :param labels: Etykiety klastrów.
     :param algorithm: Algorytm klasteryzacji użyty do etykiet.
     :param top_n: Liczba antyrekomendacji.
     :return: Lista antyrekomendowanych filmów.
     """
-    user_cluster = labels[matrix.index.get_loc(user)]
-    cluster_members = matrix.index[labels == user_cluster]
-    cluster_mean = matrix.loc[cluster_members].mean()
-    watched = matrix.loc[user]
-    anti_recommendations = cluster_mean[watched == 0].sort_values(ascending=True).head(top_n).index.tolist()
+    cluster_mean, watched = cluster_mean_and_watched(user, matrix, labels)
+    anti_recommendations = cluster_mean[watched == 0].sort_values(ascending=True, kind='stable').head(top_n).index.tolist()
     return anti_recommendations
 
 
+class RecommendationIndex:
+    """
+    Indeks rekomendacji budowany raz dla wyniku klasteryzacji.
+
+    Przechowuje wektory średnich ocen każdego klastra oraz częściowe uporządkowanie
+    filmów: tylko tyle najlepszych i najgorszych filmów, ile potrzeba, żeby po odrzuceniu
+    obejrzanych zostało top_n pozycji dla każdego członka klastra. Rekomendacje dla
+    wszystkich użytkowników powstają naraz, operacjami na tablicach numpy.
+    Remisy średnich są rozstrzygane kolejnością filmów w macierzy.
+    """
+
+    def __init__(self, matrix, labels, top_n=5):
+        """
+        :param matrix: Macierz użytkownik-film (DataFrame lub SparseUserItemMatrix).
+        :param labels: Etykiety klastrów.
+        :param top_n: Największa liczba (anty)rekomendacji, o którą można pytać.
+        """
+        self.users = matrix.index
+        self.films = matrix.columns
+        self.top_n = top_n
+        values = matrix.values if is_sparse(matrix) else matrix.to_numpy(dtype=np.float64)
+        self.values = sparse.csr_matrix(values)
+        self.clusters, self.cluster_means, _ = cluster_centroids(self.values, np.asarray(labels))
+        self.user_clusters = np.searchsorted(self.clusters, np.asarray(labels))
+
+        watched_counts = np.diff(self.values.indptr)
+        self.best, self.worst = [], []
+        for cluster, means in enumerate(self.cluster_means):
+            # obejrzane filmy mogą zająć co najwyżej tyle pozycji listy kandydatów
+            watched = watched_counts[self.user_clusters == cluster].max(initial=0)
+            size = min(top_n + watched, len(means))
+            self.best.append(self.partial_order(-means, size))
+            self.worst.append(self.partial_order(means, size))
+
+    @staticmethod
+    def partial_order(keys, size):
+        """
+        :return: Indeksy size najmniejszych kluczy, posortowane (stabilnie, remisy według indeksu).
+        """
+        if size < len(keys):
+            # wszystkie klucze równe size-temu, żeby remis na granicy rozstrzygała kolejność filmów
+            kth = keys[np.argpartition(keys, size - 1)[size - 1]]
+            candidates = np.flatnonzero(keys <= kth)
+        else:
+            candidates = np.arange(len(keys))
+        return candidates[np.argsort(keys[candidates], kind='stable')][:size]
+
+    def select(self, rows, candidates, top_n):
+        """
+        Wybiera dla podanych użytkowników pierwsze top_n nieobejrzanych filmów z listy.
+
+        :return: Kody filmów (użytkownicy x top_n), -1 gdy zabrakło kandydatów.
+        """
+        available = self.values[rows][:, candidates].toarray() == 0
+        positions = np.argsort(~available, axis=1, kind='stable')[:, :top_n]
+        picked = candidates[positions]
+        picked[~np.take_along_axis(available, positions, axis=1)] = -1
+        return picked
+
+    def batch(self, top_n=None, anti=False):
+        """
+        Rekomendacje (lub antyrekomendacje) dla wszystkich użytkowników naraz.
+
+        :param top_n: Liczba pozycji (domyślnie top_n indeksu).
+        :param anti: True dla antyrekomendacji.
+        :return: Kody filmów (użytkownicy x top_n), -1 gdy zabrakło kandydatów.
+        """
+        top_n = self.top_n if top_n is None else min(top_n, self.top_n)
+        orders = self.worst if anti else self.best
+        result = np.full((len(self.users), top_n), -1, dtype=np.int64)
+        for cluster, candidates in enumerate(orders):
+            rows = np.flatnonzero(self.user_clusters == cluster)
+            if len(rows):
+                result[rows, :min(top_n, len(candidates))] = self.select(rows, candidates, top_n)
+        return result
+
+    def recommend(self, user, top_n=None, anti=False):
+        """
+        :param user: Nazwa użytkownika.
+        :return: Lista (anty)rekomendowanych filmów dla jednego użytkownika.
+        """
+        top_n = self.top_n if top_n is None else min(top_n, self.top_n)
+        row = self.users.get_loc(user)
+        orders = self.worst if anti else self.best
+        codes = self.select([row], orders[self.user_clusters[row]], top_n)[0]
+        return self.films[codes[codes >= 0]].tolist()
+
+    def to_frame(self, top_n=None):
+        """
+        :return: DataFrame z kolumnami Użytkownik, Typ, Pozycja, Film dla wszystkich użytkowników.
+        """
+        frames = []
+        for kind, anti in (('rekomendacja', False), ('antyrekomendacja', True)):
+            codes = self.batch(top_n, anti)
+            rows, positions = np.nonzero(codes >= 0)
+            frames.append(pd.DataFrame({
+                'Użytkownik': self.users[rows],
+                'Typ': kind,
+                'Pozycja': positions + 1,
+                'Film': self.films[codes[rows, positions]],
+            }))
+        return pd.concat(frames, ignore_index=True)
+
+    def export(self, path, top_n=None):
+        """
+        Zapisuje rekomendacje i antyrekomendacje wszystkich użytkowników do pliku CSV.
+
+        :param path: Ścieżka do pliku CSV.
+        :param top_n: Liczba pozycji na użytkownika.
+        """
+        self.to_frame(top_n).to_csv(path, index=False, encoding='utf-8')
+
+
 def display_recommendations(user, recommendations, distance_metric, algorithm):
     """
     Wyświetla rekomendacje.
@@ -0,0 +1,269 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from data_loader import load_matrix_cached
+from incremental import IncrementalKMeans
+from orchestrator import fit_all_clusterings
+from recommendation import RecommendationIndex
+
+ALGORITHMS = ('kmeans', 'agglomerative', 'gmm')
+MAX_TOP_N = 20
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           500: 'Internal Server Error'}
+
+
+def build_indexes(filepath, top_n=MAX_TOP_N):
+    """
+    Ładuje dane, dopasowuje trzy modele i buduje dla nich indeksy rekomendacji.
+    Uruchamiane w osobnym procesie; wydruki funkcji klasteryzacji są pomijane.
+
+    :param filepath: Ścieżka do pliku JSON.
+    :param top_n: Największa liczba rekomendacji w odpowiedzi.
+    :return: Słownik algorytm -> RecommendationIndex oraz IncrementalKMeans dla POST /ratings.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        matrix = load_matrix_cached(filepath)
+        results = fit_all_clusterings(matrix, n_clusters=3)
+    indexes = {
+        name.lower(): RecommendationIndex(matrix, result['labels'], top_n=top_n)
+        for name, result in results.items()
+    }
+    return indexes, IncrementalKMeans(matrix, n_clusters=3)
+
+
+def parse_ratings(body):
+    """
+    :param body: Treść żądania: lista obiektów JSON z polami Użytkownik, Film, Ocena.
+    :return: DataFrame z ocenami.
+    """
+    try:
+        records = json.loads(body or b'[]')
+        if not isinstance(records, list):
+            raise TypeError
+        ratings = pd.DataFrame(records, columns=['Użytkownik', 'Film', 'Ocena'])
+        ratings['Ocena'] = ratings['Ocena'].astype(float)
+    except (ValueError, TypeError):
+        raise HttpError(400, "Oczekiwano listy JSON obiektów z polami 'Użytkownik', 'Film', 'Ocena'")
+    if ratings[['Użytkownik', 'Film', 'Ocena']].isna().any().any():
+        raise HttpError(400, "Każda ocena musi mieć pola 'Użytkownik', 'Film' i 'Ocena'")
+    return ratings
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class RecommendationService:
+    """
+    Serwis HTTP (asyncio) trzymający macierz i indeksy rekomendacji w pamięci.
+
+    Dopasowanie modeli odbywa się w puli procesów (przy starcie i po POST /reload), a
+    zapytania o rekomendacje w puli wątków, więc pętla zdarzeń tylko przyjmuje i odsyła
+    żądania. Nowe indeksy podmieniane są w całości, dopiero gdy są gotowe.
+
+    Endpointy:
+    - GET /health
+    - GET /users
+    - GET /recommendations?user=...&algorithm=kmeans&top_n=5
+    - GET /anti-recommendations?user=...&algorithm=kmeans&top_n=5
+    - POST /reload
+    - POST /ratings (lista ocen JSON: Użytkownik, Film, Ocena)
+
+    POST /ratings wprowadza nowe lub zmienione oceny do K-Means przyrostowo
+    (IncrementalKMeans) i podmienia tylko indeks 'kmeans'; pozostałe algorytmy widzą
+    nowe oceny dopiero po ponownym dopasowaniu. POST /reload wczytuje plik od nowa, więc
+    odrzuca oceny dodane przez POST /ratings; obie zmiany są podmieniane pod tą samą
+    blokadą, więc kończąca się aktualizacja nie nadpisze świeżo wczytanych indeksów.
+    """
+
+    def __init__(self, filepath, workers=4):
+        self.filepath = filepath
+        self.indexes = None
+        self.kmeans = None
+        self.updating = asyncio.Lock()
+        self.threads = ThreadPoolExecutor(max_workers=workers)
+        self.processes = ProcessPoolExecutor(max_workers=1)
+        self.reloading = None
+
+    async def reload(self):
+        """
+        Dopasowuje modele od nowa w puli procesów i podmienia indeksy.
+
+        :return: Czas dopasowania w sekundach.
+        """
+        if self.reloading is None:
+            self.reloading = asyncio.ensure_future(self._reload())
+        try:
+            return await asyncio.shield(self.reloading)
+        finally:
+            if self.reloading is not None and self.reloading.done():
+                self.reloading = None
+
+    async def _reload(self):
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        indexes, kmeans = await loop.run_in_executor(self.processes, build_indexes, self.filepath)
+        # POST /ratings w toku dokończy zmianę na starym modelu, zanim indeksy zostaną podmienione
+        async with self.updating:
+            self.indexes, self.kmeans = indexes, kmeans
+        return time.perf_counter() - start
+
+    def add_ratings(self, ratings):
+        """
+        Aktualizuje K-Means przyrostowo i buduje nowy indeks 'kmeans'.
+
+        :return: Podsumowanie aktualizacji z IncrementalKMeans.update.
+        """
+        summary = self.kmeans.update(ratings)
+        index = RecommendationIndex(self.kmeans.matrix, self.kmeans.labels, top_n=MAX_TOP_N)
+        self.indexes = dict(self.indexes, kmeans=index)
+        return summary
+
+    def recommend(self, query, anti):
+        user = query.get('user', [None])[0]
+        algorithm = query.get('algorithm', ['kmeans'])[0].lower()
+        if user is None:
+            raise HttpError(400, "Brak parametru 'user'")
+        if algorithm not in ALGORITHMS:
+            raise HttpError(400, f"Nieznany algorytm '{algorithm}', dostępne: {', '.join(ALGORITHMS)}")
+        try:
+            top_n = int(query.get('top_n', ['5'])[0])
+        except ValueError:
+            raise HttpError(400, "Parametr 'top_n' musi być liczbą")
+        if not 1 <= top_n <= MAX_TOP_N:
+            raise HttpError(400, f"Parametr 'top_n' musi być z zakresu 1-{MAX_TOP_N}")
+
+        if algorithm not in self.indexes:
+            raise HttpError(404, f"Algorytm '{algorithm}' nie został dopasowany dla tych danych")
+        index = self.indexes[algorithm]
+        if user not in index.users:
+            raise HttpError(404, f"Nieznany użytkownik '{user}'")
+        return {
+            'user': user,
+            'algorithm': algorithm,
+            'anti': anti,
+            'films': index.recommend(user, top_n=top_n, anti=anti),
+        }
+
+    async def route(self, method, target, body=b''):
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        loop = asyncio.get_running_loop()
+
+        if url.path == '/health':
+            return {'status': 'ok', 'ready': self.indexes is not None}
+        if url.path == '/reload':
+            if method != 'POST':
+                raise HttpError(405, 'Użyj POST')
+            return {'reloaded': True, 'seconds': round(await self.reload(), 3)}
+        if url.path == '/ratings':
+            if method != 'POST':
+                raise HttpError(405, 'Użyj POST')
+            ratings = parse_ratings(body)
+            if self.indexes is None:
+                await self.reload()
+            async with self.updating:
+                return await loop.run_in_executor(self.threads, self.add_ratings, ratings)
+        if url.path not in ('/users', '/recommendations', '/anti-recommendations'):
+            raise HttpError(404, f"Nieznana ścieżka '{url.path}'")
+        if method != 'GET':
+            raise HttpError(405, 'Użyj GET')
+        if self.indexes is None:
+            await self.reload()
+        if url.path == '/users':
+            return {'users': self.indexes['kmeans'].users.tolist()}
+        anti = url.path == '/anti-recommendations'
+        return await loop.run_in_executor(self.threads, self.recommend, query, anti)
+
+    async def handle(self, reader, writer):
+        """
+        Obsługuje połączenie HTTP/1.1 (z keep-alive) i odpowiada w formacie JSON.
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = None
+                try:
+                    length = int(headers.get('content-length', 0))
+                    if length < 0:
+                        raise ValueError(length)
+                    request_body = await reader.readexactly(length) if length else b''
+                    method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                    body, status = await self.route(method, target, request_body), 200
+                except HttpError as error:
+                    body, status = {'error': str(error)}, error.status
+                except ValueError:
+                    body, status = {'error': 'Niepoprawne żądanie'}, 400
+                except Exception as error:  # noqa: BLE001 - serwis nie może paść na jednym żądaniu
+                    body, status = {'error': repr(error)}, 500
+
+                payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+                # bez poprawnej długości treści nie wiadomo, gdzie zaczyna się następne żądanie
+                keep_alive = length is not None and length >= 0 and headers.get('connection', '').lower() != 'close'
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1')
+                    + payload
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8080):
+        seconds = await self.reload()
+        print(f"=== Modele dopasowane w {seconds:.2f} s ===")
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Serwis rekomendacji działa na http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.threads.shutdown()
+        self.processes.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serwis HTTP rekomendatora filmów')
+    parser.add_argument('--dane', default='dane_filmy.json', help='plik JSON z ocenami')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=4, help='wątki obsługujące zapytania')
+    args = parser.parse_args()
+
+    service = RecommendationService(args.dane, workers=args.workers)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -2,17 +2,20 @@ from sklearn.decomposition import PCA
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from data_loader import matrix_values
+
+
 def visualize_clusters(matrix, labels, algorithm, distance_metric):
     """
     Wizualizuje klastry użytkowników za pomocą PCA.
 
-    :param matrix: Macierz użytkownik-film.
+    :param matrix: Macierz użytkownik-film (DataFrame lub SparseUserItemMatrix).
     :param labels: Etykiety klastrów.
     :param algorithm: Algorytm klasteryzacji.
     :param distance_metric: Metryka odległości użyta do klasteryzacji.
     """
     pca = PCA(n_components=2)
-    components = pca.fit_transform(matrix)
+    components = pca.fit_transform(matrix_values(matrix))
 
     plt.figure(figsize=(10, 7))
     sns.scatterplot(x=components[:, 0], y=components[:, 1], hue=labels, palette='viridis', s=100)